@@ -2,11 +2,12 @@ from typing import Dict, Any, List, Optional
 
 
 class YangMainModuleConfiguration:
-    def __init__(self, name, prefix, disable, skip_prefix_mode) -> None:
+    def __init__(self, name, prefix, disable, skip_prefix_mode, prune=False) -> None:
         self.name: str = name
         self.prefix: str = prefix
         self.disable: bool = disable
         self.skip_prefix_mode: bool = skip_prefix_mode
+        self.prune: bool = prune
 
     def get_name(self) -> str:
         return self.name
@@ -20,6 +21,9 @@ class YangMainModuleConfiguration:
     def get_skip_prefix_mode(self) -> bool:
         return self.skip_prefix_mode
 
+    def get_prune(self) -> bool:
+        return self.prune
+
 
 class YangModulesConfiguration:
     def __init__(self, config: Dict[str, Any]) -> None:
@@ -30,7 +34,7 @@ class YangModulesConfiguration:
         self.features: Optional[List[str]] = None
 
         for module in config["main"]:
-            self.main_modules.append(YangMainModuleConfiguration(module["name"], module["prefix"], module["disable"] if "disable" in module else False, module["skip_prefix_mode"] if "skip_prefix_mode" in module else None))
+            self.main_modules.append(YangMainModuleConfiguration(module["name"], module["prefix"], module["disable"] if "disable" in module else False, module["skip_prefix_mode"] if "skip_prefix_mode" in module else None, module.get("prune", False)))
 
         if "other" in config:
             self.other_modules = config["other"]
@@ -47,6 +51,17 @@ class YangModulesConfiguration:
     def get_features(self) -> Optional[List[str]]:
         return self.features
 
+    def get_module_features(self) -> Dict[str, Any]:
+        """
+        Returns all modules to load in the order of loading, mapped to their enabled features ("*" for all).
+        """
+        features = self.features if self.features is not None else {}
+        modules = {}
+        for name in [module.get_name() for module in self.main_modules] + self.other_modules:
+            modules[name] = "*" if not name in features else features[name]
+
+        return modules
+
 
 class YangPrefixConfiguration:
     def __init__(self, config: Dict[str, Any]) -> None:
@@ -69,10 +84,40 @@ class YangTypesConfiguration:
         return self.types_map
 
 
+class YangNodesConfiguration:
+    def __init__(self, config: Dict[str, Any]) -> None:
+        self.include: List[str] = config.get("include", [])
+        self.exclude: List[str] = config.get("exclude", [])
+        # validity periods of the pull data caches in milliseconds mapped by XPath
+        self.pull_cache: Dict[str, int] = config.get("pull_cache", {})
+
+        for validity in self.pull_cache.values():
+            assert isinstance(validity, int) and validity >= 0
+
+        # storages of the list entries mapped by XPath
+        self.list_storage: Dict[str, str] = config.get("list_storage", {})
+
+        for storage in self.list_storage.values():
+            assert storage in ["map", "hash"]
+
+    def get_include(self) -> List[str]:
+        return self.include
+
+    def get_exclude(self) -> List[str]:
+        return self.exclude
+
+    def get_pull_cache(self) -> Dict[str, int]:
+        return self.pull_cache
+
+    def get_list_storage(self) -> Dict[str, str]:
+        return self.list_storage
+
+
 class YangConfiguration:
     def __init__(self, config: Dict[str, Any]):
         self.mod_cfg: YangModulesConfiguration = YangModulesConfiguration(config["modules"])
         self.types_cfg: YangTypesConfiguration = YangTypesConfiguration(config["types"])
+        self.nodes_cfg: YangNodesConfiguration = YangNodesConfiguration(config.get("nodes", {}))
 
     def get_modules_configuration(self) -> YangModulesConfiguration:
         return self.mod_cfg
@@ -80,14 +125,78 @@ class YangConfiguration:
     def get_types_configuration(self) -> YangTypesConfiguration:
         return self.types_cfg
 
+    def get_nodes_configuration(self) -> YangNodesConfiguration:
+        return self.nodes_cfg
+
+
+class BuildConfiguration:
+    def __init__(self, config: Dict[str, Any]) -> None:
+        self.precompiled_headers: bool = config.get("precompiled_headers", False)
+        self.unity_build: bool = config.get("unity_build", False)
+        self.unity_batch_size: int = config.get("unity_batch_size", 16)
+
+        assert self.unity_batch_size > 0
+
+    def get_precompiled_headers(self) -> bool:
+        return self.precompiled_headers
+
+    def get_unity_build(self) -> bool:
+        return self.unity_build
+
+    def get_unity_batch_size(self) -> int:
+        return self.unity_batch_size
+
+
+class GeneratorOptions:
+    def __init__(self, jobs: int = 1, incremental: bool = False, parallel_render: bool = False, cache_dir: Optional[str] = None,
+                 only: Optional[List[str]] = None, archive: Optional[str] = None, format_cache_size: int = 256 * 1024 * 1024) -> None:
+        self.jobs: int = jobs
+        self.incremental: bool = incremental
+        self.parallel_render: bool = parallel_render
+        self.cache_dir: Optional[str] = cache_dir
+        self.only: Optional[List[str]] = only
+        self.archive: Optional[str] = archive
+        self.format_cache_size: int = format_cache_size
+
+    def get_jobs(self) -> int:
+        return self.jobs
+
+    def get_incremental(self) -> bool:
+        return self.incremental
+
+    def get_parallel_render(self) -> bool:
+        return self.parallel_render
+
+    def get_cache_dir(self) -> Optional[str]:
+        return self.cache_dir
+
+    def get_only(self) -> Optional[List[str]]:
+        return self.only
+
+    def get_archive(self) -> Optional[str]:
+        return self.archive
+
+    def get_format_cache_size(self) -> int:
+        return self.format_cache_size
+
 
 class GeneratorConfiguration:
     def __init__(self, config: Dict[str, Any]):
         self.name: str = config["generator"]["name"]
+        self.layout: str = config["generator"].get("layout", "node")
+        self.build_cfg: BuildConfiguration = BuildConfiguration(config["generator"].get("build", {}))
         self.yang_cfg: YangConfiguration = YangConfiguration(config["yang"])
 
+        assert self.layout in ["node", "subtree"]
+
     def get_name(self) -> str:
         return self.name
 
+    def get_layout(self) -> str:
+        return self.layout
+
+    def get_build_configuration(self) -> BuildConfiguration:
+        return self.build_cfg
+
     def get_yang_configuration(self) -> YangConfiguration:
         return self.yang_cfg
@@ -0,0 +1,85 @@
+from typing import Any, Dict, List
+
+import libyang
+
+
+class PooledContext:
+    def __init__(self, yang_dir: str):
+        self.yang_dir: str = yang_dir
+        self.ctx: libyang.Context = libyang.Context(yang_dir)
+        self.modules: Dict[str, Any] = {}
+
+    def get_ctx(self) -> libyang.Context:
+        return self.ctx
+
+    def get_modules(self) -> Dict[str, Any]:
+        return self.modules
+
+
+class LibyangContextPool:
+    """
+    Pool of libyang contexts shared by several generator runs in the same process, so that the modules several
+    plugins start with are parsed only once.
+
+    Every module loaded into a context is implemented and may augment or deviate other modules, and the order of the
+    augmented nodes follows the order of loading. Hence, a context is only reused by a run whose modules start with
+    all the modules already loaded into the context, in the same order and with the same features. The remaining
+    modules are loaded into the context by the run afterwards, which results in the same schema as a new context.
+
+    Runs starting with different modules never share a context, even if they import the same modules. These imports
+    are parsed once per run.
+
+    Methods
+    -------
+    is_compatible(loaded, requested)
+        Checks whether a context with the loaded modules can be used for the requested modules.
+    acquire(yang_dir, modules)
+        Returns a context for the requested modules.
+    """
+
+    def __init__(self):
+        self.contexts: List[PooledContext] = []
+
+    @staticmethod
+    def is_compatible(loaded: Dict[str, Any], requested: Dict[str, Any]) -> bool:
+        """
+        Parameters
+        ----------
+        loaded : Dict[str, Any]
+            Modules loaded into a context in the order of loading, mapped to their features.
+        requested : Dict[str, Any]
+            Modules to load in the order of loading, mapped to their features.
+        """
+        if len(loaded) > len(requested):
+            return False
+
+        return all(loaded_name == name and LibyangContextPool.__normalize(loaded_features) == LibyangContextPool.__normalize(features)
+                   for (loaded_name, loaded_features), (name, features) in zip(loaded.items(), requested.items()))
+
+    @staticmethod
+    def __normalize(features: Any) -> Any:
+        return features if isinstance(features, str) else sorted(features)
+
+    def acquire(self, yang_dir: str, modules: Dict[str, Any]) -> libyang.Context:
+        """
+        Returns the context with the most modules already loaded that is compatible with the requested modules or a
+        new context. The requested modules are registered as loaded, the caller has to load them.
+
+        Parameters
+        ----------
+        yang_dir : str
+            Directory containing all the Yang modules.
+        modules : Dict[str, Any]
+            Modules to load, mapped to their features.
+        """
+        candidates = [entry for entry in self.contexts
+                      if entry.yang_dir == yang_dir and self.is_compatible(entry.get_modules(), modules)]
+        if candidates:
+            entry = max(candidates, key=lambda candidate: len(candidate.get_modules()))
+        else:
+            entry = PooledContext(yang_dir)
+            self.contexts.append(entry)
+
+        entry.get_modules().update(modules)
+
+        return entry.get_ctx()
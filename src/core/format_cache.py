@@ -0,0 +1,119 @@
+import hashlib
+import os
+import subprocess
+
+from typing import List, Optional, Tuple
+
+
+class FormatCache:
+    """
+    On-disk cache of formatted files, so that clang-format only runs for files whose rendered text changed.
+
+    Entries are keyed by the rendered text, the file extension (which selects the language), the style file and the
+    clang-format version. The cache is limited in size, the least recently used entries are evicted first.
+
+    Methods
+    -------
+    get_style_key(style_file)
+        Computes the part of the keys shared by all files formatted with a style.
+    get_key(style_key, file, text)
+        Computes the key of a rendered file.
+    load(key)
+        Returns the formatted text or None on a cache miss.
+    store(key, text)
+        Stores a formatted text.
+    evict()
+        Removes the least recently used entries until the cache fits into its size limit.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int):
+        """
+        Parameters
+        ----------
+        cache_dir : str
+            Cache directory, the entries are stored in its subdirectory format.
+        max_size : int
+            Maximum size of all entries in bytes.
+        """
+
+        self.dir: str = os.path.join(cache_dir, "format")
+        self.max_size: int = max_size
+
+    @staticmethod
+    def get_style_key(style_file: str) -> str:
+        digest = hashlib.sha256()
+
+        result = subprocess.run(["clang-format", "--version"], capture_output=True, text=True)
+        digest.update(result.stdout.encode())
+
+        with open(style_file, "rb") as file:
+            digest.update(file.read())
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def get_key(style_key: str, file: str, text: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(style_key.encode())
+        digest.update(os.path.splitext(file)[1].encode())
+        digest.update(b"\0")
+        digest.update(text.encode())
+
+        return digest.hexdigest()
+
+    def __get_path(self, key: str) -> str:
+        return os.path.join(self.dir, key[:2], key)
+
+    def load(self, key: str) -> Optional[str]:
+        path = self.__get_path(key)
+        try:
+            with open(path, "r") as file:
+                text = file.read()
+            # the modification time is the time of the last use
+            os.utime(path)
+        except OSError:
+            return None
+
+        return text
+
+    def store(self, key: str, text: str):
+        path = self.__get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        with open(tmp_path, "w") as file:
+            file.write(text)
+        os.replace(tmp_path, path)
+
+    def evict(self) -> int:
+        """
+        Returns
+        -------
+        int
+            Number of removed entries.
+        """
+        entries: List[Tuple[int, int, str]] = []
+        size = 0
+        for root, _, names in os.walk(self.dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                size += stat.st_size
+
+        removed = 0
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+            removed += 1
+
+        return removed
@@ -1,6 +1,8 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 
-from core.config import GeneratorConfiguration
+from core.config import GeneratorConfiguration, GeneratorOptions
+from core.phases import PhaseRecorder
+from core.profile import GeneratorProfile
 
 
 class Generator:
@@ -16,13 +18,22 @@ class Generator:
     generate_files()
         Generates plugin files.
     apply_formatting()
-        Applies formatting to the generated files.
+        Applies formatting to the generated files and returns the files that failed to be formatted.
+    write_output()
+        Writes the generated files into the output directory unless they were generated there directly.
+    get_phases()
+        Returns the recorder of the wall time and memory usage of the generation phases.
+    log_profile(count)
+        Logs the timings of the generation phases and the count slowest templates and Yang nodes.
     """
 
-    def __init__(self, yang_dir: str, out_dir: str, config: GeneratorConfiguration):
+    def __init__(self, yang_dir: str, out_dir: str, config: GeneratorConfiguration, options: GeneratorOptions = GeneratorOptions()):
         self.out_dir = out_dir
         self.yang_dir = yang_dir
         self.config = config
+        self.options = options
+        self.phases = PhaseRecorder()
+        self.profile = GeneratorProfile()
 
     def generate_directories(self):
         pass
@@ -33,5 +44,14 @@ class Generator:
     def generate_files(self):
         pass
 
-    def apply_formatting(self):
+    def apply_formatting(self) -> List[str]:
+        return []
+
+    def write_output(self):
+        pass
+
+    def get_phases(self) -> PhaseRecorder:
+        return self.phases
+
+    def log_profile(self, count: int):
         pass
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+
+from typing import Dict, Optional
+
+
+class OutputManifest:
+    """
+    Manifest of the files written into an output directory, mapping each file (relative to the output directory)
+    to the hash of its final content. It's written by every run writing into a directory, so that an incremental run
+    knows which files were generated before.
+
+    Methods
+    -------
+    load()
+        Loads the manifest from the output directory, if existing.
+    save()
+        Writes the manifest into the output directory.
+    hash_file(path)
+        Returns the hash of a file on disk or None if it doesn't exist.
+    get_hash(file)
+        Returns the stored hash of a file or None if unknown.
+    set_hash(file, digest)
+        Stores the hash of a file.
+    """
+
+    FILENAME = ".generator-manifest.json"
+    VERSION = 1
+
+    def __init__(self, out_dir: str):
+        self.path: str = os.path.join(out_dir, self.FILENAME)
+        self.files: Dict[str, str] = {}
+
+    @staticmethod
+    def hash_content(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def hash_file(path: str) -> Optional[str]:
+        """
+        Returns the hash of the content of a file or None if it doesn't exist.
+        """
+        try:
+            with open(path, "rb") as file:
+                return OutputManifest.hash_content(file.read())
+        except FileNotFoundError:
+            return None
+
+    def load(self):
+        self.files = {}
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            # a broken manifest is treated like a missing one, i.e. all files are compared by content
+            return
+
+        if data.get("version") == self.VERSION:
+            self.files = data.get("files", {})
+
+    def save(self):
+        with open(self.path, "w") as file:
+            json.dump({"version": self.VERSION, "files": self.files}, file, indent=1, sort_keys=True)
+
+    def get_files(self) -> Dict[str, str]:
+        return self.files
+
+    def get_hash(self, file: str) -> Optional[str]:
+        return self.files.get(file)
+
+    def set_hash(self, file: str, digest: str):
+        self.files[file] = digest
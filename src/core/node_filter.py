@@ -0,0 +1,82 @@
+from typing import Dict, List
+
+from libyang.schema import Node as LyNode
+from libyang.schema import SNode
+
+from core.utils import normalize_data_path
+
+
+class NodeFilter:
+    """
+    Decides which Yang nodes are pruned, see the include and exclude XPaths of [yang.nodes] and the prune setting of
+    the main modules. Pruned nodes and their subtrees are not walked, hence, they get neither classes, files, types nor
+    CMake lines, and their parents are generated as if they didn't exist.
+
+    A node is pruned if:
+        - it's a top-level node of a pruned module,
+        - it's within an excluded subtree,
+        - include XPaths are given and it's neither within an included subtree nor an ancestor of one.
+
+    The keys of a generated list are never pruned.
+
+    Methods
+    -------
+    is_active()
+        Returns whether any node can be pruned at all.
+    is_pruned(node)
+        Returns whether a node is pruned.
+    get_unmatched()
+        Returns the include and exclude XPaths which didn't match any node so far.
+    """
+
+    def __init__(self, include: List[str], exclude: List[str], pruned_modules: List[str]):
+        """
+        Parameters
+        ----------
+        include : List[str]
+            XPaths of the subtrees to generate, all subtrees if empty.
+        exclude : List[str]
+            XPaths of the subtrees not to generate.
+        pruned_modules : List[str]
+            Names of the main modules whose nodes are all pruned.
+        """
+
+        self.include: Dict[str, str] = {normalize_data_path(xpath): xpath for xpath in include}
+        self.exclude: Dict[str, str] = {normalize_data_path(xpath): xpath for xpath in exclude}
+        self.pruned_modules: List[str] = pruned_modules
+        self.matched: Dict[str, bool] = {}
+
+    def is_active(self) -> bool:
+        return bool(self.include or self.exclude or self.pruned_modules)
+
+    def __match(self, paths: Dict[str, str], path: str) -> bool:
+        for subtree in paths:
+            if path == subtree or path.startswith(subtree + "/"):
+                self.matched[paths[subtree]] = True
+                return True
+
+        return False
+
+    def is_pruned(self, node: SNode) -> bool:
+        if not self.is_active():
+            return False
+
+        if node.nodetype() == LyNode.LEAF and node.is_key():
+            # the class of a list can't be generated without its keys
+            return False
+
+        if node.parent() is None and node.module().name() in self.pruned_modules:
+            return True
+
+        path = normalize_data_path(node.data_path())
+        if self.__match(self.exclude, path):
+            return True
+
+        if self.include and not self.__match(self.include, path):
+            # ancestors of the included subtrees are generated for the path to them
+            return not any(subtree.startswith(path + "/") for subtree in self.include)
+
+        return False
+
+    def get_unmatched(self) -> List[str]:
+        return [xpath for xpath in list(self.include.values()) + list(self.exclude.values()) if xpath not in self.matched]
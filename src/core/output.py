@@ -0,0 +1,158 @@
+import abc
+import io
+import os
+import sys
+import tarfile
+import time
+import zipfile
+
+from typing import Dict, List
+
+
+class OutputBackend(abc.ABC):
+    """
+    Destination of the generated files. Files and directories are addressed by paths relative to the output root.
+
+    Methods
+    -------
+    make_dir(path)
+        Creates a directory.
+    write(path, text)
+        Writes a file, replacing its previous content.
+    read(path)
+        Returns the content of a written file.
+    close()
+        Finishes the output after all files are written and formatted.
+    """
+
+    def make_dir(self, path: str):
+        pass
+
+    @abc.abstractmethod
+    def write(self, path: str, text: str):
+        pass
+
+    @abc.abstractmethod
+    def read(self, path: str) -> str:
+        pass
+
+    def close(self):
+        pass
+
+
+class FileSystemOutput(OutputBackend):
+    """
+    Writes each file into a directory tree.
+    """
+
+    def __init__(self, root: str):
+        self.root: str = root
+
+    def get_path(self, path: str) -> str:
+        return os.path.join(self.root, path)
+
+    def make_dir(self, path: str):
+        os.makedirs(self.get_path(path), exist_ok=True)
+
+    def write(self, path: str, text: str):
+        with open(self.get_path(path), "w") as file:
+            file.write(text)
+
+    def read(self, path: str) -> str:
+        with open(self.get_path(path), "r") as file:
+            return file.read()
+
+
+class MemoryOutput(OutputBackend):
+    """
+    Keeps all files in memory, e.g. until they're formatted and written at once.
+    """
+
+    def __init__(self):
+        self.dirs: List[str] = []
+        self.files: Dict[str, str] = {}
+
+    def make_dir(self, path: str):
+        if path and path not in self.dirs:
+            self.dirs.append(path)
+
+    def write(self, path: str, text: str):
+        self.files[path] = text
+
+    def read(self, path: str) -> str:
+        return self.files[path]
+
+    def get_dirs(self) -> List[str]:
+        return self.dirs
+
+    def has_file(self, path: str) -> bool:
+        return path in self.files
+
+
+class ArchiveOutput(MemoryOutput):
+    """
+    Collects all files in memory and streams them into a single tar or zip archive when closed, so that no file
+    system operations are needed per file. The archive is written to a file or to the standard output for "-".
+    """
+
+    FORMATS = ["tar", "tar.gz", "zip"]
+
+    def __init__(self, path: str, format: str):
+        super().__init__()
+
+        if format not in self.FORMATS:
+            raise ValueError("Unknown archive format {}, expected one of {}".format(format, ", ".join(self.FORMATS)))
+
+        self.path: str = path
+        self.format: str = format
+
+    def __write_tar(self, stream, mtime: float):
+        with tarfile.open(fileobj=stream, mode="w|gz" if self.format == "tar.gz" else "w|") as archive:
+            for path in self.dirs:
+                info = tarfile.TarInfo(path)
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+                info.mtime = mtime
+                archive.addfile(info)
+
+            for path, text in self.files.items():
+                content = text.encode("utf-8")
+                info = tarfile.TarInfo(path)
+                info.size = len(content)
+                info.mode = 0o644
+                info.mtime = mtime
+                archive.addfile(info, io.BytesIO(content))
+
+    def __write_zip(self, stream, mtime: float):
+        date_time = time.localtime(mtime)[:6]
+        with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as archive:
+            for path in self.dirs:
+                info = zipfile.ZipInfo(path + "/", date_time)
+                info.external_attr = (0o40755 << 16) | 0x10
+                archive.writestr(info, b"")
+
+            for path, text in self.files.items():
+                content = text.encode("utf-8")
+                info = zipfile.ZipInfo(path, date_time)
+                info.external_attr = 0o100644 << 16
+                info.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(info, content)
+
+    def close(self):
+        mtime = time.time()
+        if self.path == "-":
+            stream = sys.stdout.buffer
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            stream = open(self.path, "wb")
+
+        try:
+            if self.format == "zip":
+                self.__write_zip(stream, mtime)
+            else:
+                self.__write_tar(stream, mtime)
+        finally:
+            if stream is sys.stdout.buffer:
+                stream.flush()
+            else:
+                stream.close()
@@ -0,0 +1,38 @@
+import contextlib
+import resource
+import time
+
+from typing import Dict, Iterator
+
+
+class PhaseRecorder:
+    """
+    Records the wall time and peak memory usage of the phases of a generator run.
+
+    A phase entered more than once accumulates its wall time. The peak memory usage is the maximum resident set size
+    of the generator process so far at the end of the phase in KiB.
+
+    Methods
+    -------
+    phase(name)
+        Context manager recording a phase.
+    get_phases()
+        Returns the recorded phases in the order they were entered first.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, float]] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            entry = self.phases.setdefault(name, {"wall": 0.0})
+            entry["wall"] += wall
+            entry["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def get_phases(self) -> Dict[str, Dict[str, float]]:
+        return self.phases
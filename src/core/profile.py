@@ -0,0 +1,71 @@
+import contextlib
+import time
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class GeneratorProfile:
+    """
+    Timings of the parts of a generator run and of each rendered template, used for profiling.
+
+    Methods
+    -------
+    timer(name)
+        Context manager timing a part of the run, e.g. a single walker.
+    add_render_time(template, node_path, seconds)
+        Adds the render time of a template for a Yang node (None for files not belonging to a node).
+    get_timers()
+        Returns the timed parts in the order they were entered first.
+    get_slowest_templates(count)
+        Returns the templates with the highest total render time.
+    get_slowest_nodes(count)
+        Returns the Yang nodes with the highest total render time of all their files.
+    """
+
+    def __init__(self):
+        self.timers: Dict[str, float] = {}
+        self.renders: List[Tuple[str, Optional[str], float]] = []
+
+    @contextlib.contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] = self.timers.get(name, 0.0) + time.perf_counter() - start
+
+    def add_render_time(self, template: str, node_path: Optional[str], seconds: float):
+        self.renders.append((template, node_path, seconds))
+
+    def get_timers(self) -> Dict[str, float]:
+        return self.timers
+
+    def __get_slowest(self, key_idx: int, count: int) -> List[Tuple[str, float, int]]:
+        totals: Dict[str, List] = {}
+        for render in self.renders:
+            if render[key_idx] is None:
+                continue
+            entry = totals.setdefault(render[key_idx], [0.0, 0])
+            entry[0] += render[2]
+            entry[1] += 1
+
+        slowest = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)[:count]
+        return [(name, seconds, renders) for name, (seconds, renders) in slowest]
+
+    def get_slowest_templates(self, count: int) -> List[Tuple[str, float, int]]:
+        """
+        Returns
+        -------
+        List[Tuple[str, float, int]]
+            Template, total render time in seconds and number of rendered files, ordered by the render time.
+        """
+        return self.__get_slowest(0, count)
+
+    def get_slowest_nodes(self, count: int) -> List[Tuple[str, float, int]]:
+        """
+        Returns
+        -------
+        List[Tuple[str, float, int]]
+            Data path of the node, total render time in seconds and number of rendered files, ordered by the render time.
+        """
+        return self.__get_slowest(1, count)
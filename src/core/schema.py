@@ -0,0 +1,370 @@
+import hashlib
+import importlib.metadata
+import json
+import os
+import pickle
+
+from typing import Any, Dict, List, Optional
+
+from libyang.schema import Node as LyNode
+
+
+class SchemaModule:
+    """
+    Compact copy of a libyang module providing the subset of its API that is used by walkers and templates.
+    """
+
+    __slots__ = ("module_name", "descr", "enabled_features", "child_nodes")
+
+    def __init__(self, name: str, description: Optional[str]):
+        self.module_name: str = name
+        self.descr: Optional[str] = description
+        self.enabled_features: List[str] = []
+        self.child_nodes: List[SchemaNode] = []
+
+    def name(self) -> str:
+        return self.module_name
+
+    def description(self) -> Optional[str]:
+        return self.descr
+
+    def children(self) -> List["SchemaNode"]:
+        return self.child_nodes
+
+    def get_enabled_features(self) -> List[str]:
+        return self.enabled_features
+
+    def __str__(self):
+        return self.module_name
+
+
+class SchemaEnum:
+    """
+    Compact copy of a libyang enum or bit value.
+    """
+
+    __slots__ = ("enum_name", "pos")
+
+    def __init__(self, name: str, position: int):
+        self.enum_name: str = name
+        self.pos: int = position
+
+    def name(self) -> str:
+        return self.enum_name
+
+    def position(self) -> int:
+        return self.pos
+
+    def __str__(self):
+        return self.enum_name
+
+
+class SchemaFeature:
+    """
+    Compact copy of an if-feature expression. Mimics the chain `if_feature.tree().feature().name()`.
+    """
+
+    __slots__ = ("feature_name",)
+
+    def __init__(self, name: str):
+        self.feature_name: str = name
+
+    def tree(self) -> "SchemaFeature":
+        return self
+
+    def feature(self) -> "SchemaFeature":
+        return self
+
+    def name(self) -> str:
+        return self.feature_name
+
+    def __str__(self):
+        return self.feature_name
+
+
+class SchemaType:
+    """
+    Compact copy of a libyang type, resolved down to its base type, its enum/bit values, union member types and the
+    type a leafref is pointing to.
+    """
+
+    __slots__ = ("type_name", "base", "enum_values", "bit_values", "member_types", "leafref")
+
+    def __init__(self, ly_type):
+        self.type_name: str = ly_type.name()
+        self.base: str = ly_type.basename()
+        self.enum_values: List[SchemaEnum] = [SchemaEnum(e.name(), e.position()) for e in ly_type.enums()]
+        self.bit_values: List[SchemaEnum] = [SchemaEnum(b.name(), b.position()) for b in ly_type.bits()]
+        self.member_types: List[SchemaType] = [SchemaType(t) for t in ly_type.union_types(True)]
+        leafref_type = ly_type.leafref_type()
+        self.leafref: Optional[SchemaType] = SchemaType(leafref_type) if leafref_type is not None else None
+
+    def name(self) -> str:
+        return self.type_name
+
+    def basename(self) -> str:
+        return self.base
+
+    def enums(self) -> List[SchemaEnum]:
+        return self.enum_values
+
+    def bits(self) -> List[SchemaEnum]:
+        return self.bit_values
+
+    def union_types(self, with_typedefs: bool = False) -> List["SchemaType"]:
+        # Member types are always copied including their typedef names.
+        return self.member_types
+
+    def leafref_type(self) -> Optional["SchemaType"]:
+        return self.leafref
+
+    def __str__(self):
+        return self.type_name
+
+
+class SchemaNode:
+    """
+    Compact copy of a libyang schema node providing the subset of its API that is used by walkers and templates.
+
+    In addition to the libyang API it carries the parent as seen by the class API walker, see get_parent().
+    """
+
+    __slots__ = ("type_id", "node_name", "mod", "descr", "data_path_str", "schema_path_str", "is_config_false",
+                 "is_deprecated", "is_obsolete", "is_key_leaf", "is_user_ordered", "features", "node_type", "default_value",
+                 "default_values", "key_nodes", "child_nodes", "parent_node", "api_parent")
+
+    def __init__(self, nodetype: int, name: str, module: SchemaModule):
+        self.type_id: int = nodetype
+        self.node_name: str = name
+        self.mod: SchemaModule = module
+        self.descr: Optional[str] = None
+        self.data_path_str: str = ""
+        self.schema_path_str: str = ""
+        self.is_config_false: bool = False
+        self.is_deprecated: bool = False
+        self.is_obsolete: bool = False
+        self.is_key_leaf: bool = False
+        self.is_user_ordered: bool = False
+        self.features: List[SchemaFeature] = []
+        self.node_type: Optional[SchemaType] = None
+        self.default_value: Any = None
+        self.default_values: List[Any] = []
+        self.key_nodes: List[SchemaNode] = []
+        self.child_nodes: List[SchemaNode] = []
+        self.parent_node: Optional[SchemaNode] = None
+        self.api_parent: Any = None
+
+    def nodetype(self) -> int:
+        return self.type_id
+
+    def name(self) -> str:
+        return self.node_name
+
+    def module(self) -> SchemaModule:
+        return self.mod
+
+    def description(self) -> Optional[str]:
+        return self.descr
+
+    def data_path(self) -> str:
+        return self.data_path_str
+
+    def schema_path(self) -> str:
+        return self.schema_path_str
+
+    def config_false(self) -> bool:
+        return self.is_config_false
+
+    def deprecated(self) -> bool:
+        return self.is_deprecated
+
+    def obsolete(self) -> bool:
+        return self.is_obsolete
+
+    def is_key(self) -> bool:
+        return self.is_key_leaf
+
+    def ordered(self) -> bool:
+        return self.is_user_ordered
+
+    def if_features(self) -> List[SchemaFeature]:
+        return self.features
+
+    def type(self) -> Optional[SchemaType]:
+        return self.node_type
+
+    def default(self) -> Any:
+        return self.default_value
+
+    def defaults(self) -> List[Any]:
+        return self.default_values
+
+    def keys(self) -> List["SchemaNode"]:
+        return self.key_nodes
+
+    def children(self) -> List["SchemaNode"]:
+        return self.child_nodes
+
+    def parent(self) -> Optional["SchemaNode"]:
+        return self.parent_node
+
+    def get_parent(self) -> Any:
+        return self.api_parent
+
+    def __str__(self):
+        return self.node_name
+
+
+class SchemaBuilder:
+    """
+    Copies libyang modules into compact and picklable SchemaModule/SchemaNode trees.
+
+    Methods
+    -------
+    build_module(ly_mod, with_tree)
+        Returns the copy of a libyang module, optionally including its whole tree.
+    """
+
+    def __init__(self):
+        self.modules: Dict[str, SchemaModule] = {}
+        self.copies: Dict[Any, SchemaNode] = {}
+
+    def build_module(self, ly_mod, with_tree: bool = True) -> SchemaModule:
+        module = self.__copy_module(ly_mod)
+        module.enabled_features = [feature.name() for feature in ly_mod.features() if feature.state()]
+        if with_tree:
+            module.child_nodes = [self.__copy_node(child) for child in ly_mod.children()]
+
+        return module
+
+    def __copy_module(self, ly_mod) -> SchemaModule:
+        if ly_mod.name() not in self.modules:
+            self.modules[ly_mod.name()] = SchemaModule(ly_mod.name(), ly_mod.description())
+        return self.modules[ly_mod.name()]
+
+    def __copy_node(self, node) -> SchemaNode:
+        # libyang creates new python objects for each access, hence, identify nodes by their C data.
+        if node.cdata in self.copies:
+            return self.copies[node.cdata]
+
+        copy = SchemaNode(node.nodetype(), node.name(), self.__copy_module(node.module()))
+        self.copies[node.cdata] = copy
+
+        copy.descr = node.description()
+        copy.data_path_str = node.data_path()
+        copy.schema_path_str = node.schema_path()
+        copy.is_config_false = node.config_false()
+        copy.is_deprecated = node.deprecated()
+        copy.is_obsolete = node.obsolete()
+        copy.features = [SchemaFeature(feature.tree().feature().name()) if hasattr(feature.tree(), "feature") else SchemaFeature(str(feature))
+                         for feature in node.if_features()]
+
+        if node.nodetype() in [LyNode.LEAF, LyNode.LEAFLIST]:
+            copy.node_type = SchemaType(node.type())
+        if node.nodetype() == LyNode.LEAF:
+            copy.is_key_leaf = node.is_key()
+            copy.default_value = node.default()
+        elif node.nodetype() == LyNode.LEAFLIST:
+            copy.default_values = list(node.defaults())
+        if node.nodetype() in [LyNode.LIST, LyNode.LEAFLIST]:
+            copy.is_user_ordered = node.ordered()
+
+        parent = node.parent()
+        if parent:
+            copy.parent_node = self.__copy_node(parent)
+
+        if hasattr(node, "children"):
+            copy.child_nodes = [self.__copy_node(child) for child in node.children()]
+        if node.nodetype() == LyNode.LIST:
+            copy.key_nodes = [self.__copy_node(key) for key in node.keys()]
+
+        return copy
+
+
+class SchemaCache:
+    """
+    On-disk cache of the copied modules.
+
+    Entries are keyed by the content of all Yang files, the loaded modules with their features, the versions of the
+    generator's schema copies and of libyang (python bindings and cffi), which compiles the schema, and the source of
+    this module, which defines the cached data.
+
+    Methods
+    -------
+    get_key(yang_dir, modules)
+        Computes the cache key.
+    load(key)
+        Returns the cached modules or None on a cache miss.
+    store(key, modules)
+        Stores the modules in the cache.
+    """
+
+    # version of the cached schema copies, increase it whenever the generator needs other data of the schema
+    VERSION = 1
+
+    # packages defining the compiled schema
+    PACKAGES = ["libyang", "cffi"]
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir: str = cache_dir
+
+    @staticmethod
+    def __get_package_version(package: str) -> str:
+        try:
+            return importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            return "unknown"
+
+    def get_key(self, yang_dir: str, modules: Dict[str, Any]) -> str:
+        """
+        Parameters
+        ----------
+        yang_dir : str
+            Directory containing all the Yang modules.
+        modules : Dict[str, Any]
+            JSON serializable description of the loaded modules and their features, as defined in the configuration.
+        """
+
+        digest = hashlib.sha256()
+
+        digest.update("generator={}\0".format(self.VERSION).encode())
+        for package in self.PACKAGES:
+            digest.update("{}={}\0".format(package, self.__get_package_version(package)).encode())
+
+        with open(__file__, "rb") as file:
+            digest.update(file.read())
+
+        digest.update(json.dumps(modules, sort_keys=True).encode())
+
+        for name in sorted(os.listdir(yang_dir)):
+            path = os.path.join(yang_dir, name)
+            if name.endswith(".yang") and os.path.isfile(path):
+                digest.update(name.encode())
+                with open(path, "rb") as file:
+                    digest.update(hashlib.sha256(file.read()).digest())
+
+        return digest.hexdigest()
+
+    def __get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, "schema-{}.pickle".format(key))
+
+    def load(self, key: str) -> Optional[List[SchemaModule]]:
+        path = self.__get_path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "rb") as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            # treat broken cache entries like a miss, they're overwritten afterwards
+            return None
+
+    def store(self, key: str, modules: List[SchemaModule]):
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        path = self.__get_path(key)
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        with open(tmp_path, "wb") as file:
+            pickle.dump(modules, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
@@ -50,6 +50,25 @@ def print_tree(children, depth=0):
             print_tree(ch.children(), depth + 1)
 
 
+def normalize_data_path(path: str) -> str:
+    """
+    Normalizes a data path or XPath of a schema node for comparisons, e.g. /ietf-interfaces:interfaces/interface for
+    /ietf-interfaces:interfaces/ietf-interfaces:interface[name='%s']. Predicates are removed and a module prefix is
+    only kept where the module differs from the module of the parent node.
+    """
+    segments = []
+    module = None
+    for segment in re.sub(r"\[[^\]]*\]", "", path).strip("/").split("/"):
+        prefix, _, name = segment.rpartition(":")
+        if prefix and prefix == module:
+            segment = name
+        elif prefix:
+            module = prefix
+        segments.append(segment)
+
+    return "/" + "/".join(segments)
+
+
 def to_c_variable(s):
     return s.replace('-', '_')
 
@@ -73,3 +73,50 @@ class Walker:
 
     def on_finish(self):
         pass
+
+
+class FusedWalker(Walker):
+    """
+    Walks the tree once for several walkers, so that each node and its children are only looked up once.
+
+    Each walker sees the same nodes in the same order as when walking the tree on its own: a node is walked for all
+    walkers whose add_node() accepted it, and its children are only offered to the walkers that walked it and didn't
+    skip its children. The on_finish() of the walkers is called in their order after the tree has been walked.
+    """
+
+    def __init__(self, root_nodes: Iterator[SNode], walkers: List[Walker]):
+        """
+        Parameters
+        ----------
+        root_nodes : Iterator[SNode]
+            Iterator of root nodes.
+        walkers : List[Walker]
+            Walkers to run, their own root nodes are ignored.
+        """
+
+        super().__init__(root_nodes)
+        self.walkers = walkers
+
+    def walk(self):
+        node_stack: List[Tuple[SNode, int, List[Walker]]] = []
+
+        for n in self.root_nodes:
+            walkers = [w for w in self.walkers if w.add_node(n)]
+            if walkers:
+                node_stack.append((n, 0, walkers))
+
+        while node_stack:
+            node, depth, walkers = node_stack.pop()
+
+            walkers = [w for w in walkers if not w.walk_node(node, depth)]
+
+            if walkers and has_children(node):
+                for n in node.children():
+                    child_walkers = [w for w in walkers if w.add_node(n)]
+                    if child_walkers:
+                        node_stack.append((n, depth + 1, child_walkers))
+
+        for w in self.walkers:
+            w.on_finish()
+
+        self.on_finish()
@@ -0,0 +1,73 @@
+import os
+import time
+
+from typing import Dict, List, Set, Tuple
+
+
+class FileWatcher:
+    """
+    Watches files and directories for changes by polling the modification times and sizes of their files, so that no
+    platform specific notification mechanism is needed.
+
+    Methods
+    -------
+    poll()
+        Returns the files that were added, removed or modified since the previous poll.
+    wait(interval)
+        Blocks until files changed and returns them.
+    """
+
+    def __init__(self, paths: List[str]):
+        """
+        Parameters
+        ----------
+        paths : List[str]
+            Files and directories (watched recursively) to watch.
+        """
+
+        self.paths: List[str] = paths
+        self.state: Dict[str, Tuple[int, int]] = self.__scan()
+
+    def __scan(self) -> Dict[str, Tuple[int, int]]:
+        files = []
+        for path in self.paths:
+            if os.path.isdir(path):
+                for root, _, names in os.walk(path):
+                    files.extend(os.path.join(root, name) for name in names)
+            else:
+                files.append(path)
+
+        state = {}
+        for file in files:
+            try:
+                stat = os.stat(file)
+            except OSError:
+                # removed while scanning
+                continue
+            state[file] = (stat.st_mtime_ns, stat.st_size)
+
+        return state
+
+    def poll(self) -> Set[str]:
+        state = self.__scan()
+        changed = {file for file in state.keys() | self.state.keys() if state.get(file) != self.state.get(file)}
+        self.state = state
+
+        return changed
+
+    def wait(self, interval: float) -> Set[str]:
+        """
+        Polls every interval seconds until files changed. Afterwards it waits until no more files change within an
+        interval, since editors and version control often write several files (or a file several times) at once.
+        """
+        changed = set()
+        while not changed:
+            time.sleep(interval)
+            changed = self.poll()
+
+        while True:
+            time.sleep(interval)
+            more = self.poll()
+            if not more:
+                return changed
+            changed |= more
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from typing import Any, Dict, List
+
+# Phases which are shorter than this (in seconds) are too noisy to be compared.
+MIN_COMPARED_WALL = 0.05
+
+# setup args
+arg_parser = argparse.ArgumentParser(description="Benchmark of the sysrepo plugin generator over a set of configurations.")
+arg_parser.add_argument("-c", "--configdir", type=str, dest="config_dir", default="config",
+                        help="Directory containing the configuration files to benchmark. Default: config")
+arg_parser.add_argument("-d", "--dir", type=str, dest="yang_dir", default="yang",
+                        help="Directory containing all the yang modules. Default: yang")
+arg_parser.add_argument("-o", "--output", type=str, dest="output", default="benchmark.json",
+                        help="JSON file to write the results into. Default: benchmark.json")
+arg_parser.add_argument("-b", "--baseline", type=str, dest="baseline", default=None,
+                        help="JSON file of a previous run to compare the results with.")
+arg_parser.add_argument("-t", "--threshold", type=float, dest="threshold", default=10.0,
+                        help="Relative increase of wall time or peak memory usage over the baseline in percent that is reported as regression. Default: 10")
+arg_parser.add_argument("-n", "--runs", type=int, dest="runs", default=1,
+                        help="Number of runs per configuration, the minimum of each measurement is kept. Default: 1")
+arg_parser.add_argument("-a", "--args", type=str, dest="generator_args", default="",
+                        help="Additional arguments passed to the generator, e.g. \"-j 4 -r\".")
+args = arg_parser.parse_args()
+
+generator_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sysrepo-plugin-generator.py")
+
+
+def run_config(config_file: str) -> Dict[str, Any]:
+    # Each run is a separate process, so that the peak memory usage isn't influenced by previous runs.
+    with tempfile.TemporaryDirectory(prefix="sysrepo-plugin-benchmark-") as tmp_dir:
+        out_dir = os.path.join(tmp_dir, "out")
+        report = os.path.join(tmp_dir, "phases.json")
+        params = [sys.executable, generator_script, "-c", config_file, "-o", out_dir, "-d", args.yang_dir,
+                  "--phase-report", report] + args.generator_args.split()
+
+        start = time.perf_counter()
+        result = subprocess.run(params, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        wall = time.perf_counter() - start
+
+        if result.returncode != 0:
+            raise RuntimeError("Generating {} failed:\n{}".format(config_file, result.stderr))
+
+        with open(report, "r") as file:
+            phases = json.load(file)
+
+    phases["total"] = {
+        "wall": wall,
+        "peak_rss_kb": max(phase["peak_rss_kb"] for phase in phases.values()),
+    }
+
+    return phases
+
+
+def merge_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    merged = runs[0]
+    for run in runs[1:]:
+        for phase, values in run.items():
+            for key, value in values.items():
+                merged[phase][key] = min(merged[phase][key], value)
+
+    return merged
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    factor = 1.0 + threshold / 100.0
+
+    for config, phases in results.items():
+        if not config in baseline:
+            continue
+
+        for phase, values in phases.items():
+            base_values = baseline[config].get(phase)
+            if base_values is None:
+                continue
+
+            for key, value in values.items():
+                base_value = base_values.get(key)
+                if not base_value or (key == "wall" and max(value, base_value) < MIN_COMPARED_WALL):
+                    continue
+
+                if value > base_value * factor:
+                    regressions.append("{}: {} {}: {:.3f} -> {:.3f} (+{:.1f}%)".format(
+                        config, phase, key, base_value, value, (value / base_value - 1.0) * 100.0))
+
+    return regressions
+
+
+results = {}
+for entry in sorted(os.listdir(args.config_dir)):
+    if not entry.endswith(".toml"):
+        continue
+
+    config = os.path.splitext(entry)[0]
+    config_file = os.path.join(args.config_dir, entry)
+
+    results[config] = merge_runs([run_config(config_file) for _ in range(max(1, args.runs))])
+
+    print("{}:".format(config))
+    for phase, values in results[config].items():
+        print("  {:<6} {:>8.3f}s {:>9} KiB".format(phase, values["wall"], values["peak_rss_kb"]))
+
+with open(args.output, "w") as file:
+    json.dump({"version": 1, "configs": results}, file, indent=1)
+
+if args.baseline:
+    with open(args.baseline, "r") as file:
+        baseline = json.load(file)
+
+    regressions = compare(results, baseline.get("configs", {}), args.threshold)
+    if regressions:
+        print("Regressions over {} (threshold {}%):".format(args.baseline, args.threshold))
+        for regression in regressions:
+            print("  " + regression)
+        sys.exit(1)
+
+    print("No regressions over {} (threshold {}%)".format(args.baseline, args.threshold))
@@ -1,36 +1,103 @@
 #!/usr/bin/env python3
 
 import argparse
-from core.config import GeneratorConfiguration
-from target.cpp.generator import CPPGenerator
-
-import toml
+import cProfile
+import json
+import os
+import sys
+from core.config import GeneratorOptions
+from core.output import ArchiveOutput
+from target.cpp.batch import PluginJob, check_jobs, generate_batch, generate_plugin, load_manifest
+from target.cpp.watch import WatchSession
 
 # setup args
 arg_parser = argparse.ArgumentParser(description="Sysrepo plugin generator.")
-arg_parser.add_argument("-c", "--config", type=str, dest="config", required=True,
-                        help="Configuration file to use for generation, perhaps one from the 'config' subfolder.")
+arg_parser.add_argument("-c", "--config", type=str, dest="config", action="append",
+                        help="Configuration file to use for generation, perhaps one from the 'config' subfolder. Can be given several times to generate several plugins.")
+arg_parser.add_argument("-m", "--manifest", type=str, dest="manifest", default=None,
+                        help="Manifest file listing the configuration files of several plugins to generate.")
 arg_parser.add_argument("-o", "--outdir", type=str, dest="out_dir", required=True,
-                        help="Output source directory to use.")
+                        help="Output source directory to use. When generating several plugins, each plugin is generated into a subdirectory.")
 arg_parser.add_argument("-d", "--dir", type=str, dest="yang_dir", default="yang",
                         help="Directory containing all the yang modules. Default: yang")
+arg_parser.add_argument("-j", "--jobs", type=int, dest="jobs", default=os.cpu_count() or 1,
+                        help="Number of parallel workers used for formatting, parallel rendering and generating several plugins. Default: number of CPUs")
+arg_parser.add_argument("-i", "--incremental", action="store_true", dest="incremental",
+                        help="Only replace files in the output directory whose content changed and remove files that are no longer generated.")
+arg_parser.add_argument("-r", "--parallel-render", action="store_true", dest="parallel_render",
+                        help="Render the API files of the Yang nodes in a pool of JOBS processes.")
+arg_parser.add_argument("--cache-dir", type=str, dest="cache_dir", default=None,
+                        help="Directory to cache the parsed Yang schema and the formatted files in, so that unchanged Yang modules don't need to be parsed and unchanged files don't need to be formatted again. Default: no caching")
+arg_parser.add_argument("--format-cache-size", type=int, dest="format_cache_size", default=256,
+                        help="Maximum size of the cached formatted files in MiB, the least recently used files are removed first. Default: 256")
+arg_parser.add_argument("--phase-report", type=str, dest="phase_report", default=None,
+                        help="Write the wall time and peak memory usage of each generation phase as JSON into the given file.")
+arg_parser.add_argument("-p", "--profile", action="store_true", dest="profile",
+                        help="Print the time of each generation phase and the slowest templates and Yang nodes after generation.")
+arg_parser.add_argument("--profile-top", type=int, dest="profile_top", default=10,
+                        help="Number of the slowest templates and Yang nodes printed by --profile. Default: 10")
+arg_parser.add_argument("--profile-dump", type=str, dest="profile_dump", default=None,
+                        help="Profile the generator with cProfile and write the statistics into the given file, e.g. for use with pstats or snakeviz.")
+arg_parser.add_argument("--archive", type=str, dest="archive", default=None, choices=ArchiveOutput.FORMATS,
+                        help="Write all generated files into a single archive of the given format at OUT_DIR instead of a directory tree, '-' writes the archive to the standard output. Requires a single configuration file.")
+arg_parser.add_argument("--only", type=str, dest="only", action="append", default=None,
+                        help="Schema XPath of a subtree, e.g. /ietf-interfaces:interfaces/interface/statistics. Only the files of the Yang nodes within the given subtrees (and files missing in the output directory) are rendered, formatted and written, all other files are kept. Can be given several times. Implies --incremental.")
+arg_parser.add_argument("-w", "--watch", action="store_true", dest="watch",
+                        help="Keep running and regenerate only the affected files whenever the Yang modules, the configuration or the templates change. Implies --incremental.")
+arg_parser.add_argument("--watch-interval", type=float, dest="watch_interval", default=1.0,
+                        help="Interval in seconds in which --watch checks for changes. Default: 1.0")
 args = arg_parser.parse_args()
 
-data = toml.load(args.config)
+if not args.config and not args.manifest:
+    arg_parser.error("either a configuration file (-c) or a manifest (-m) is required")
+
+if args.watch and (args.manifest or len(args.config) != 1):
+    arg_parser.error("--watch requires exactly one configuration file (-c)")
+
+if args.archive and (args.manifest or len(args.config) != 1 or args.incremental or args.only or args.watch):
+    arg_parser.error("--archive requires exactly one configuration file (-c) and can't be combined with --incremental, --only or --watch")
+
+# files outside of the selected subtrees are kept in the output directory, which needs the incremental mode
+options = GeneratorOptions(args.jobs, args.incremental or bool(args.only), args.parallel_render, args.cache_dir, args.only, args.archive,
+                           args.format_cache_size * 1024 * 1024)
 
-config = GeneratorConfiguration(data)
+if args.watch:
+    try:
+        WatchSession(args.config[0], args.yang_dir, args.out_dir, options, args.profile_top if args.profile else None).run(args.watch_interval)
+    except KeyboardInterrupt:
+        sys.exit(0)
 
-# currently only C++ generator is supported
-generator = CPPGenerator(args.yang_dir, args.out_dir, config)
+profiler = None
+if args.profile_dump:
+    profiler = cProfile.Profile()
+    profiler.enable()
 
-# generate project directory structure
-generator.generate_directories()
+if args.config and len(args.config) == 1 and not args.manifest:
+    # a single plugin is generated directly into the output directory
+    results = [generate_plugin(PluginJob(os.path.splitext(os.path.basename(args.config[0]))[0], args.config[0], args.out_dir),
+                               args.yang_dir, options, args.profile_top if args.profile else None)]
+else:
+    # several plugins are generated into subdirectories of the output directory
+    jobs = [PluginJob(os.path.splitext(os.path.basename(config))[0], config, os.path.join(args.out_dir, os.path.splitext(os.path.basename(config))[0]))
+            for config in args.config or []]
+    if args.manifest:
+        jobs += load_manifest(args.manifest, args.out_dir)
+    try:
+        check_jobs(jobs)
+    except ValueError as error:
+        arg_parser.error(str(error))
+    results = generate_batch(jobs, args.yang_dir, options, args.profile_top if args.profile else None)
 
-# copy files which do not need generation
-# generator.copy_files()
+if profiler:
+    profiler.disable()
+    profiler.dump_stats(args.profile_dump)
 
-# generate all project files
-generator.generate_files()
+if args.phase_report:
+    with open(args.phase_report, "w") as file:
+        if len(results) == 1:
+            json.dump(results[0].get_phases(), file, indent=1)
+        else:
+            json.dump({result.get_name(): result.get_phases() for result in results}, file, indent=1)
 
-# apply formatting to the generated files
-generator.apply_formatting()
+if any(result.get_failed_files() for result in results):
+    sys.exit(1)
@@ -0,0 +1,222 @@
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+from typing import Any, Dict, List, Optional
+
+import jinja2
+import toml
+
+from core.config import GeneratorConfiguration, GeneratorOptions
+from core.context_pool import LibyangContextPool
+
+from .generator import CPPGenerator
+from .render import create_jinja2_env
+
+
+class PluginJob:
+    """
+    Plugin to generate in a (batch) run.
+    """
+
+    def __init__(self, name: str, config_file: str, out_dir: str):
+        self.name: str = name
+        self.config_file: str = config_file
+        self.out_dir: str = out_dir
+        self.config: GeneratorConfiguration = GeneratorConfiguration(toml.load(config_file))
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_config_file(self) -> str:
+        return self.config_file
+
+    def get_out_dir(self) -> str:
+        return self.out_dir
+
+    def get_config(self) -> GeneratorConfiguration:
+        return self.config
+
+    def get_modules(self) -> Dict[str, Any]:
+        return self.config.get_yang_configuration().get_modules_configuration().get_module_features()
+
+
+class PluginResult:
+    """
+    Picklable result of a generated plugin.
+    """
+
+    def __init__(self, name: str, failed_files: List[str], phases: Dict[str, Dict[str, float]]):
+        self.name: str = name
+        self.failed_files: List[str] = failed_files
+        self.phases: Dict[str, Dict[str, float]] = phases
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_failed_files(self) -> List[str]:
+        return self.failed_files
+
+    def get_phases(self) -> Dict[str, Dict[str, float]]:
+        return self.phases
+
+
+def load_manifest(path: str, out_dir: str) -> List[PluginJob]:
+    """
+    Loads the plugins to generate from a manifest file, e.g.
+
+        [[plugin]]
+        config = "config/ietf-system.toml"
+        outdir = "system"
+
+    Relative config paths are relative to the manifest. The output directories are relative to out_dir and default to
+    the name of the config file.
+    """
+    data = toml.load(path)
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    jobs = []
+    for entry in data.get("plugin", []):
+        config_file = os.path.join(base_dir, entry["config"])
+        name = entry.get("outdir", os.path.splitext(os.path.basename(config_file))[0])
+        jobs.append(PluginJob(name, config_file, os.path.join(out_dir, name)))
+
+    return jobs
+
+
+def check_jobs(jobs: List[PluginJob]):
+    """
+    Rejects plugins with the same name or output directory, e.g. of configuration files with the same name in
+    different directories, which would be generated into the same directory and mixed up in the results.
+
+    Raises
+    ------
+    ValueError
+        If two plugins have the same name or output directory.
+    """
+    names: Dict[str, PluginJob] = {}
+    out_dirs: Dict[str, PluginJob] = {}
+    for job in jobs:
+        if job.get_name() in names:
+            raise ValueError("Plugins {} and {} have the same name {}, set a different outdir in the manifest".format(
+                names[job.get_name()].get_config_file(), job.get_config_file(), job.get_name()))
+        names[job.get_name()] = job
+
+        out_dir = os.path.normcase(os.path.abspath(job.get_out_dir()))
+        if out_dir in out_dirs:
+            raise ValueError("Plugins {} and {} have the same output directory {}".format(
+                out_dirs[out_dir].get_config_file(), job.get_config_file(), job.get_out_dir()))
+        out_dirs[out_dir] = job
+
+
+def plan_groups(jobs: List[PluginJob]) -> List[List[PluginJob]]:
+    """
+    Splits the plugins into groups, which are generated one after the other in the same process and hence share
+    their libyang contexts. Plugins are added to the group whose last plugin loads the most modules the plugin starts
+    with, see LibyangContextPool.is_compatible(), so that modules are parsed as rarely as possible.
+    """
+    groups: List[List[PluginJob]] = []
+    for job in sorted(jobs, key=lambda job: len(job.get_modules())):
+        candidates = [group for group in groups if LibyangContextPool.is_compatible(group[-1].get_modules(), job.get_modules())]
+        if candidates:
+            max(candidates, key=lambda group: len(group[-1].get_modules())).append(job)
+        else:
+            groups.append([job])
+
+    return groups
+
+
+def generate_plugin(job: PluginJob, yang_dir: str, options: GeneratorOptions, profile_top: Optional[int] = None,
+                    context_pool: Optional[LibyangContextPool] = None, jinja_env: Optional[jinja2.Environment] = None) -> PluginResult:
+    # currently only C++ generator is supported
+    generator = CPPGenerator(yang_dir, job.get_out_dir(), job.get_config(), options, context_pool, jinja_env)
+
+    return run_generator(generator, job.get_name(), profile_top)
+
+
+def run_generator(generator: CPPGenerator, name: str, profile_top: Optional[int] = None) -> PluginResult:
+    """
+    Runs the remaining phases of a generator, which already loaded and walked the Yang modules.
+    """
+    phases = generator.get_phases()
+
+    with phases.phase("render"):
+        # generate project directory structure
+        generator.generate_directories()
+
+        # copy files which do not need generation
+        # generator.copy_files()
+
+        # generate all project files
+        generator.generate_files()
+
+    # apply formatting to the generated files
+    with phases.phase("format"):
+        failed_files = generator.apply_formatting()
+
+    # write the changed files into the output directory (incremental mode only)
+    with phases.phase("write"):
+        generator.write_output()
+
+    if profile_top is not None:
+        generator.log_profile(profile_top)
+
+    return PluginResult(name, failed_files, phases.get_phases())
+
+
+# Jinja2 environment of the batch process, inherited by the group workers where processes are forked.
+_batch_env: Optional[jinja2.Environment] = None
+
+
+def generate_group(group: List[PluginJob], yang_dir: str, options: GeneratorOptions, profile_top: Optional[int] = None) -> List[PluginResult]:
+    context_pool = LibyangContextPool()
+    jinja_env = _batch_env if _batch_env is not None else create_jinja2_env()
+
+    return [generate_plugin(job, yang_dir, options, profile_top, context_pool, jinja_env) for job in group]
+
+
+def generate_batch(jobs: List[PluginJob], yang_dir: str, options: GeneratorOptions, profile_top: Optional[int] = None) -> List[PluginResult]:
+    """
+    Generates several plugins. Plugins sharing their Yang modules are generated in the same process with shared
+    libyang contexts, independent groups of plugins are generated in up to options.get_jobs() processes. All plugins
+    share the compiled templates.
+
+    Returns
+    -------
+    List[PluginResult]
+        Results in the order of the jobs.
+    """
+    global _batch_env
+
+    check_jobs(jobs)
+
+    for job in jobs:
+        os.makedirs(os.path.dirname(os.path.abspath(job.get_out_dir())), exist_ok=True)
+
+    groups = plan_groups(jobs)
+    workers = min(options.get_jobs(), len(groups))
+
+    # compile all templates once, so that forked workers don't have to
+    _batch_env = create_jinja2_env()
+    for template in _batch_env.list_templates(extensions=["jinja2"]):
+        _batch_env.get_template(template)
+
+    if workers <= 1:
+        group_results = [generate_group(group, yang_dir, options, profile_top) for group in groups]
+    else:
+        # share the formatting jobs between the workers
+        group_options = GeneratorOptions(max(1, options.get_jobs() // workers), options.get_incremental(),
+                                         options.get_parallel_render(), options.get_cache_dir(), options.get_only(), options.get_archive(),
+                                         options.get_format_cache_size())
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(generate_group, group, yang_dir, group_options, profile_top) for group in groups]
+            group_results = [future.result() for future in futures]
+
+    # the results of a group are in the order of its jobs, which are the same objects as the given jobs
+    indices = {id(job): idx for idx, job in enumerate(jobs)}
+    results: List[Optional[PluginResult]] = [None] * len(jobs)
+    for group, group_result in zip(groups, group_results):
+        for job, result in zip(group, group_result):
+            results[indices[id(job)]] = result
+
+    return results
@@ -2,38 +2,50 @@ import logging
 import os
 import shutil
 import subprocess
-import pathlib
+import tempfile
+import time
 
-import jinja2
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
+import jinja2
 import libyang
 
 from pprint import pformat
 
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Set, Tuple
 
-from core.config import GeneratorConfiguration
+from core.config import GeneratorConfiguration, GeneratorOptions
+from core.format_cache import FormatCache
+from core.context_pool import LibyangContextPool
 from core.generator import Generator
+from core.manifest import OutputManifest
+from core.node_filter import NodeFilter
+from core.output import ArchiveOutput, FileSystemOutput, MemoryOutput
+from core.walker import FusedWalker
 
-from core.log.filters import DebugLevelFilter, InfoLevelFilter
+from core.log.filters import DebugLevelFilter, InfoLevelFilter, WarningLevelFilter, ErrorLevelFilter
 
 from .walkers.api.cppclass import ClassAPIWalker
-from .walkers.types import TypesWalker
+from .walkers.types import TypesWalker, TypeResolver
+from .model import RenderModelBuilder
+from .render import RenderTask, count_lines, create_jinja2_env, init_render_worker, render_task
+
+from core.schema import SchemaBuilder, SchemaCache, SchemaModule
 
-from core.utils import to_camel_case, to_c_variable, format_descr
+from core.utils import to_camel_case, to_c_variable, format_descr, normalize_data_path
 
 from libyang.schema import Node as LyNode
 
 
 class ModuleGenerator:
     def __init__(self, ly_mod, name, prefix, disable, skip_prefix_mode):
-        self.ly_mod: libyang.Module = ly_mod
+        self.ly_mod: SchemaModule = ly_mod
         self.name: str = name
         self.prefix: str = prefix
         self.disable: bool = disable
         self.skip_prefix_mode: bool = skip_prefix_mode
 
-    def get_ly_module(self) -> libyang.Module:
+    def get_ly_module(self) -> SchemaModule:
         return self.ly_mod
     
     def get_name(self) -> str:
@@ -62,9 +74,11 @@ class YangNodeType:
 
 
 class GeneratedFile:
-    def __init__(self, file, disabled=False):
+    def __init__(self, file, disabled=False, rendered=True):
         self.file: str = file
         self.disabled: bool = disabled
+        # False for files which were kept from a previous run in the output directory, see set_render_filter()
+        self.rendered: bool = rendered
 
     def __str__(self):
         return ("[Disabled] " if self.disabled else "[Enabled]  ") + self.file
@@ -75,15 +89,33 @@ class GeneratedFile:
     def get_disabled(self):
         return self.disabled
 
+    def get_rendered(self):
+        return self.rendered
+
 
 class CPPGenerator(Generator):
-    def __init__(self, yang_dir: str, out_dir: str, config: GeneratorConfiguration):
-        super().__init__(yang_dir, out_dir, config)
+    # Maximum number of files passed to a single clang-format call.
+    FORMAT_BATCH_SIZE = 64
+    # Style applied to all generated C++ files.
+    CLANG_FORMAT_FILE = "templates/common/.clang-format"
+    # Headers included by (almost) all API classes, which are precompiled if enabled in the build configuration.
+    PRECOMPILE_HEADERS = ["<vector>", "<optional>", "<functional>", "<srpcpp.hpp>", "<libyang-cpp/DataNode.hpp>", "core/api/base.hpp"]
+
+    def __init__(self, yang_dir: str, out_dir: str, config: GeneratorConfiguration, options: GeneratorOptions = GeneratorOptions(),
+                 context_pool: Optional[LibyangContextPool] = None, jinja_env: Optional[jinja2.Environment] = None):
+        super().__init__(yang_dir, out_dir, config, options)
+
+        # resources shared with other generators in the same process, see batch.py
+        self.context_pool: Optional[LibyangContextPool] = context_pool
+        self.shared_jinja_env: Optional[jinja2.Environment] = jinja_env
 
         # setup logger for the generator
         self.logger: logging.Logger = logging.getLogger("CPPGenerator")
         self.logger.setLevel(logging.DEBUG)
 
+        # remove the handlers of a previous generator in the same process, e.g. in batch mode
+        self.logger.handlers.clear()
+
         # Debug level handler
         debug_handler = logging.StreamHandler()
         debug_handler.setLevel(logging.DEBUG)
@@ -102,38 +134,158 @@ class CPPGenerator(Generator):
         info_handler.addFilter(InfoLevelFilter())
         self.logger.addHandler(info_handler)
 
+        # Warning level handler
+        warning_handler = logging.StreamHandler()
+        warning_handler.setLevel(logging.WARNING)
+        warning_formatter = logging.Formatter(
+            '[%(levelname)s][%(name)s]: %(message)s')
+        warning_handler.setFormatter(warning_formatter)
+        warning_handler.addFilter(WarningLevelFilter())
+        self.logger.addHandler(warning_handler)
+
+        # Error level handler
+        error_handler = logging.StreamHandler()
+        error_handler.setLevel(logging.ERROR)
+        error_formatter = logging.Formatter(
+            '[%(levelname)s][%(name)s]: %(message)s')
+        error_handler.setFormatter(error_formatter)
+        error_handler.addFilter(ErrorLevelFilter())
+        self.logger.addHandler(error_handler)
+
         self.logger.info("Starting C++ generator")
 
         # initialize libyang and jinja2
         self.modules: List[ModuleGenerator] = []
-        self.__setup_libyang_ctx(yang_dir)
+        with self.phases.phase("load"):
+            self.__setup_libyang_ctx(yang_dir)
         self.__setup_jinja2_env()
 
+        # All files are rendered and formatted in memory and written once afterwards, see write_output(). Archives
+        # are written from memory directly.
+        if self.options.get_archive() is not None:
+            self.output: MemoryOutput = ArchiveOutput(out_dir, self.options.get_archive())
+        else:
+            self.output = MemoryOutput()
+
         # list of generated files
         self.generated_files: List[GeneratedFile] = []
 
         # setup and run walkers
-        self.source_dir = out_dir
-
+        self.source_dir = self.out_dir
+
+        # pruned Yang nodes aren't walked at all
+        nodes_config = self.config.get_yang_configuration().get_nodes_configuration()
+        self.node_filter: NodeFilter = NodeFilter(
+            nodes_config.get_include(), nodes_config.get_exclude(),
+            [module.get_name() for module in self.config.get_yang_configuration().get_modules_configuration().get_main_modules() if module.get_prune()])
+
+        # per node options, their XPaths are matched when building the render models
+        pull_cache = nodes_config.get_pull_cache()
+        pull_cache_matched: Set[str] = set()
+        list_storage = nodes_config.get_list_storage()
+        list_storage_matched: Set[str] = set()
+
+        with self.phases.phase("walk"):
+            for module in self.modules:
+                module.class_api_walker = ClassAPIWalker(
+                    module.get_prefix(), module.get_skip_prefix_mode(), module.get_ly_module().children(), self.source_dir, module.get_disable(),
+                    self.config.get_layout(), self.node_filter)
+                module.types_walker = TypesWalker(
+                    module.get_prefix(), module.get_ly_module().children(), self.node_filter)
+
+                # run all walkers in a single traversal of the tree
+                walker = FusedWalker(module.get_ly_module().children(), [
+                    module.class_api_walker,
+                    module.types_walker
+                ])
+
+                with self.profile.timer("walk {}".format(module.get_name())):
+                    walker.walk()
+
+                for kept, dropped in module.types_walker.get_collisions():
+                    self.logger.warning("Type {} of {} differs from the type of the same name of {}, which is used instead".format(
+                        kept.get_name(), dropped.get_path(), kept.get_path()))
+
+                module.type_resolver = TypeResolver(
+                    module.types_walker.ctx,
+                    self.config.get_yang_configuration().get_types_configuration().get_types_map(),
+                    module.class_api_walker.get_types(),
+                    to_camel_case(to_c_variable(module.get_prefix()), True) + "Types")
+
+                # resolve everything the templates need once per node, the model of a node is shared by all its files
+                with self.profile.timer("build render models"):
+                    builder = RenderModelBuilder(module.type_resolver, self.node_filter, pull_cache, list_storage)
+                    module.render_models = builder.build(module.class_api_walker.ctx.tree)
+                    pull_cache_matched |= builder.get_matched("pull_cache")
+                    list_storage_matched |= builder.get_matched("list_storage")
+
+                for path in builder.get_kept_storages():
+                    self.logger.warning("List {} keeps the map storage, since it's ordered-by user or has a bits key".format(path))
+
+            for xpath in self.node_filter.get_unmatched():
+                self.logger.warning("No Yang node within {}".format(xpath))
+
+            for xpath in pull_cache:
+                if normalize_data_path(xpath) not in pull_cache_matched:
+                    self.logger.warning("No generated state node {} for the pull data cache".format(xpath))
+
+            for xpath in list_storage:
+                if normalize_data_path(xpath) not in list_storage_matched:
+                    self.logger.warning("No list {} for the list storage".format(xpath))
+
+        # all files are rendered unless a filter is set
+        self.render_filter: Optional[Callable[[str, str], bool]] = None
+
+        # files of the Yang subtrees selected with GeneratorOptions.get_only(), None if all subtrees are generated
+        self.subtree_files: Optional[Set[str]] = self.__get_subtree_files(self.options.get_only()) if self.options.get_only() else None
+
+    def set_render_filter(self, render_filter: Optional[Callable[[str, str], bool]]):
+        """
+        Sets a filter deciding which files are rendered, e.g. in watch mode. It's called with the template (without the
+        .jinja2 extension) and the path of the file relative to the output directory. Files which are not rendered are
+        still part of the generated files (e.g. in CMakeLists.txt), but they're neither formatted nor written, instead
+        the file of a previous run is kept in the output directory. Requires the incremental mode.
+        """
+        self.render_filter = render_filter
+
+    def __get_subtree_files(self, xpaths: List[str]) -> Set[str]:
+        """
+        Returns the files of the Yang nodes within the subtrees of the given XPaths, relative to the output directory.
+        """
+        paths = [normalize_data_path(xpath) for xpath in xpaths]
+        matched = set()
+
+        files = set()
         for module in self.modules:
-            module.class_api_walker = ClassAPIWalker(
-                module.get_prefix(), module.get_skip_prefix_mode(), module.get_ly_module().children(), self.source_dir)
-            module.types_walker = TypesWalker(
-                module.get_prefix(), module.get_ly_module().children())
-
-            # run walkers
-            walkers = [
-                module.class_api_walker,
-                module.types_walker
-            ]
-
-            for walker in walkers:
-                walker.walk()
-
+            for entry in module.class_api_walker.get_plan():
+                # the files of a node also contain its members in the subtree layout
+                for ctx in [entry.get_ctx()] + entry.get_members():
+                    node_path = normalize_data_path(ctx.node.data_path())
+                    for path in paths:
+                        if node_path == path or node_path.startswith(path + "/"):
+                            matched.add(path)
+                            files.update(file.path[len(self.out_dir):][1:] for file in entry.get_files())
+
+        for xpath, path in zip(xpaths, paths):
+            if path not in matched:
+                self.logger.warning("No generated Yang node within {}".format(xpath))
+
+        return files
+
+    def __select_file(self, template: str, file: str) -> bool:
+        # Files missing in the output directory (e.g. deleted by the user) are always rendered, so that the output is
+        # complete.
+        if not os.path.exists(os.path.join(self.out_dir, file)):
+            return True
+
+        # Outside of the selected subtrees no files are rendered. CMakeLists.txt lists all files and is only written
+        # if it changed.
+        if self.subtree_files is not None and file not in self.subtree_files and file != "CMakeLists.txt":
+            return False
+
+        return self.render_filter is None or self.render_filter(template, file)
 
     def __setup_libyang_ctx(self, yang_dir: str):
-        self.ctx = libyang.Context(yang_dir)
-
         # access configurations
         yang_cfg = self.config.get_yang_configuration()
         mod_cfg = yang_cfg.get_modules_configuration()
@@ -141,46 +293,76 @@ class CPPGenerator(Generator):
         # load features (optional, if None then all are enabled)
         features = mod_cfg.get_features()
 
-        # load main modules
-        for module in mod_cfg.get_main_modules():
-            m = module.get_name()
-            mod = self.ctx.load_module(m, None, "*" if not m in features else features[m])
-            enabled_features = [feature.name() for feature in mod.features() if feature.state()]
-            self.logger.info("Loaded module {} with features: {}".format(mod.name(), ", ".join(enabled_features) if len(enabled_features) > 0 else "<none>"))
-
-        # load all needed modules
-        for m in yang_cfg.get_modules_configuration().get_other_modules():
-            mod = self.ctx.load_module(m, None, "*" if not m in features else features[m])
-            enabled_features = [feature.name() for feature in mod.features() if feature.state()]
+        # the walkers and templates only work on a copy of the loaded modules, which can be cached
+        cache = None
+        loaded = None
+        if self.options.get_cache_dir():
+            cache = SchemaCache(self.options.get_cache_dir())
+            cache_key = cache.get_key(yang_dir, {
+                "main": [module.get_name() for module in mod_cfg.get_main_modules()],
+                "other": mod_cfg.get_other_modules(),
+                "features": features,
+            })
+            loaded = cache.load(cache_key)
+            if loaded is not None:
+                self.logger.info("Loaded Yang schema from cache {}".format(self.options.get_cache_dir()))
+
+        if loaded is None:
+            loaded = self.__load_modules(yang_dir)
+            if cache:
+                cache.store(cache_key, loaded)
+
+        for mod in loaded:
+            enabled_features = mod.get_enabled_features()
             self.logger.info("Loaded module {} with features: {}".format(mod.name(), ", ".join(enabled_features) if len(enabled_features) > 0 else "<none>"))
 
         # use main modules for plugin generation
+        schema_modules = {mod.name(): mod for mod in loaded}
         for module in mod_cfg.get_main_modules():
-            ly_mod = self.ctx.get_module(module.get_name())
-            self.modules.append(ModuleGenerator(ly_mod, module.get_name(), module.get_prefix(), module.get_disable(), module.get_skip_prefix_mode()))
-
-            self.logger.info("Loaded module {}".format((ly_mod.name())))
+            schema_mod = schema_modules[module.get_name()]
+            self.modules.append(ModuleGenerator(schema_mod, module.get_name(), module.get_prefix(), module.get_disable(), module.get_skip_prefix_mode()))
+
+            self.logger.info("Loaded module {}".format((schema_mod.name())))
+
+    def __load_modules(self, yang_dir: str) -> List[SchemaModule]:
+        """
+        Loads the configured modules with libyang and copies them.
+
+        Returns
+        -------
+        List[SchemaModule]
+            Copies of all loaded modules in the order of loading. Only the trees of the main modules are copied.
+        """
+        mod_cfg = self.config.get_yang_configuration().get_modules_configuration()
+        main_modules = [module.get_name() for module in mod_cfg.get_main_modules()]
+        modules = mod_cfg.get_module_features()
+
+        if self.context_pool is not None:
+            self.ctx = self.context_pool.acquire(yang_dir, modules)
+        else:
+            self.ctx = libyang.Context(yang_dir)
+
+        # load main modules and all needed modules
+        ly_mods = []
+        for m, m_features in modules.items():
+            ly_mods.append(self.ctx.load_module(m, None, m_features))
+
+        # copy the modules only after all of them are loaded, since other modules may e.g. augment the main modules
+        builder = SchemaBuilder()
+        return [builder.build_module(ly_mod, ly_mod.name() in main_modules) for ly_mod in ly_mods]
 
     def __setup_jinja2_env(self):
-        self.jinja_env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(["templates/cpp/", "templates/cpp/utils/"]),
-            extensions=['jinja2.ext.loopcontrols'],
-            autoescape=jinja2.select_autoescape(),
-            trim_blocks=True,
-            lstrip_blocks=True
-        )
+        self.jinja_env = self.shared_jinja_env if self.shared_jinja_env is not None else create_jinja2_env()
 
     def generate_directories(self):
-        plugin_dir = os.path.join(self.source_dir, "core")
         dirs = [
-            self.source_dir,
-            plugin_dir,
-            os.path.join(plugin_dir, "api"),
+            "",
+            "core",
+            os.path.join("core", "api"),
         ]
 
         for dir in dirs:
-            if not os.path.exists(dir):
-                os.mkdir(dir)
+            self.output.make_dir(dir)
 
         for module in self.modules:
             self.__generate_walker_dirs(module.class_api_walker)
@@ -188,8 +370,7 @@ class CPPGenerator(Generator):
     def __generate_walker_dirs(self, walker):
         dirs = walker.get_directories()
         for dir in dirs:
-            if not os.path.exists(dir):
-                os.mkdir(dir)
+            self.output.make_dir(dir[len(self.source_dir):][1:])
 
     def copy_files(self):
         # copy CMake Find scripts
@@ -203,20 +384,27 @@ class CPPGenerator(Generator):
             shutil.copyfile(src_path, dst_path)
 
     def __generate_file(self, file, disabled = False, outfile = "", **kwargs):
-        template = self.jinja_env.get_template("{}.jinja2".format(file))
+        gen = file if outfile == "" else outfile
+        if not self.__select_file(file, gen):
+            self.generated_files.append(GeneratedFile(gen, disabled, False))
+            return 0
+
+        # templates are compiled when loaded first, keep that out of the render times
+        with self.profile.timer("load templates"):
+            template = self.jinja_env.get_template("{}.jinja2".format(file))
 
-        path = os.path.join(self.out_dir, file if outfile == "" else outfile)
-        self.generated_files.append(GeneratedFile(file if outfile == "" else outfile, disabled))
+        path = os.path.join(self.out_dir, gen)
+        self.generated_files.append(GeneratedFile(gen, disabled))
         self.logger.info("Generating {}".format(path))
 
-        with open(path, "w") as file:
-            file.write(template.render(kwargs))
+        start = time.perf_counter()
+        text = template.render(kwargs)
+        node = kwargs.get("node")
+        self.profile.add_render_time(file, node.data_path() if node else None, time.perf_counter() - start)
 
-        num_lines = 0
-        with open(path, "rbU") as file:
-            num_lines = sum(1 for _ in file)
+        self.output.write(gen, text)
 
-        return num_lines
+        return count_lines(text)
 
     def __generate_core_files(self):
         self.__generate_file(
@@ -253,10 +441,9 @@ class CPPGenerator(Generator):
         self.__generate_file(
             "core/api/logging.hpp")
 
-        counters = {}
-        total_class_count = 0
-        total_loc_count = 0
-        for module in self.modules:
+        # Collect everything to render per Yang node first, then render it either here or in a process pool.
+        tasks = []
+        for module_idx, module in enumerate(self.modules):
             self.logger.info("Generating API files for module {}:".format(module.get_name()))
 
             user_types = self.config.get_yang_configuration().get_types_configuration().get_types_map()
@@ -274,71 +461,53 @@ class CPPGenerator(Generator):
                 to_c_variable=to_c_variable, 
                 to_camel_case=to_camel_case)
 
-            for idx,file in enumerate(module.class_api_walker.get_api_filenames()):
-                ctx = module.class_api_walker.get_file_ctx(file)
-                node=ctx.node
-                node_type_name = None
-                node_types = []
-                if node.nodetype() in [LyNode.LEAF, LyNode.LEAFLIST]:
-                    node_type_name = module.types_walker.get_type_name(node)
-                    enum = module.types_walker.get_enum(node_type_name)
-                    node_types += [enum.name] if enum is not None else []
-                    bit = module.types_walker.get_bit(node_type_name)
-                    node_types += [bit.name] if bit is not None else []
-                    union = module.types_walker.get_union(node_type_name)
-                    node_types += [union.name] if union is not None else []
-                
-                # In case the node itself or any of its children is a list then get the types of their keys since they're required e.g. for the constructor.
-                known_keys = []
-                check_nodes = [node] + (list(node.children()) if not node.nodetype() in [LyNode.LEAF, LyNode.LEAFLIST] else [])
-                for entry in check_nodes:
-                    if entry.nodetype() == LyNode.LIST:
-                        for key in entry.keys():
-                            # Since that's a list both enum and union are still None
-                            key_name = module.types_walker.get_type_name(key)
-                            enum_key = module.types_walker.get_enum(key_name)
-                            if enum_key:
-                                known_keys.append(enum_key)
-                            bit_key = module.types_walker.get_bit(key_name)
-                            if bit_key:
-                                known_keys.append(bit_key)
-                            union_key = module.types_walker.get_union(key_name)
-                            if union_key:
-                                known_keys.append(union_key)
-
-                # disable cmake build if module.get_disable() except for the Yang root nodes
-                disable = module.get_disable() if idx != 0 else False
-
-                ext = os.path.splitext(file)[1]
-                loc_count = self.__generate_file(
-                    "core/api/class{}".format(ext if not file.endswith("-ctx.hpp") else "-ctx.hpp"), disable, file[len(self.out_dir):][1:],
-                    module=module,
-                    prefix=ctx.prefix, 
-                    parent_prefix=ctx.parent_prefix,
-                    node=node, 
+            for entry in module.class_api_walker.get_plan():
+                ctx = entry.get_ctx()
+                node = ctx.node
+                children_skip_prefix = module.get_skip_prefix_mode() == "all" or (module.get_skip_prefix_mode() == "root" and not ctx.parent_prefix)
+
+                member_paths = [(member.node.data_path(), to_camel_case(to_c_variable(member.prefix), True),
+                                 to_camel_case(to_c_variable(member.parent_prefix), True)) for member in entry.get_members()]
+
+                kwargs = dict(
+                    module_name=module.get_name(),
+                    class_name=to_camel_case(to_c_variable(ctx.prefix), True),
+                    parent_class_name=to_camel_case(to_c_variable(ctx.parent_prefix), True) if ctx.parent_prefix is not None else None,
+                    children_prefix="" if children_skip_prefix else to_camel_case(to_c_variable(ctx.prefix), True),
                     LyNode=LyNode,
-                    user_types=user_types, 
-                    static_types=static_types, 
-                    node_types=node_types, 
                     comment="// " if module.get_disable() else "",
-                    node_types_namespace=to_camel_case(to_c_variable(module.get_prefix()), True) + "Types",
-                    known_keys=known_keys,
-                    node_type_name=node_type_name,
-                    children_skip_prefix=module.get_skip_prefix_mode() == "all" or (module.get_skip_prefix_mode() == "root" and not ctx.parent_prefix),
                     to_c_variable=to_c_variable, 
                     to_camel_case=to_camel_case,
                     format_descr=format_descr)
-            
-                if ext == ".cpp":
-                    node_type = str(YangNodeType(node.nodetype()))
+                for file in entry.get_files():
+                    tasks.append((RenderTask(file.template, file.path, file.disable, module_idx, node.data_path(), kwargs, member_paths), node))
+
+        if self.options.get_parallel_render() and self.options.get_jobs() > 1 and len(tasks) > 1:
+            loc_counts = self.__render_parallel([task for task, _ in tasks])
+        else:
+            models = [module.render_models for module in self.modules]
+            loc_counts = [self.__generate_file(task.template, task.disable, task.path[len(self.out_dir):][1:], node=node,
+                                               model=models[task.module_idx][task.node_path], members=task.get_members(models),
+                                               **task.kwargs)
+                          for task, node in tasks]
+
+        counters = {}
+        total_class_count = 0
+        total_loc_count = 0
+        for (task, node), loc_count in zip(tasks, loc_counts):
+            if task.path.endswith(".cpp"):
+                # the source of a node also contains the classes of its members in the subtree layout
+                models = self.modules[task.module_idx].render_models
+                for class_node in [node] + [models[path].node for path, _, _ in task.member_paths]:
+                    node_type = str(YangNodeType(class_node.nodetype()))
                     if not node_type in counters:
                         item = {"state": 0, "config": 0}
                         counters[node_type] = item
 
-                    state_type = "state" if node.config_false() else "config"
+                    state_type = "state" if class_node.config_false() else "config"
                     counters[node_type][state_type] = counters[node_type][state_type] + 1
                     total_class_count += 1
-                    total_loc_count += loc_count
+                total_loc_count += loc_count
 
         self.logger.info("core/api Generation Summary:")
         self.logger.info("------------------------------")
@@ -357,48 +526,294 @@ class CPPGenerator(Generator):
         # self.logger.info("API Generation Summary:\n{}".format(generated_files))
 
             
+    def __render_parallel(self, tasks: List[RenderTask]) -> List[int]:
+        """
+        Renders the given tasks in a process pool. Each worker gets the render models of all walker trees once.
+
+        Returns
+        -------
+        List[int]
+            Number of lines of each rendered file in the order of the tasks.
+        """
+        models = [module.render_models for module in self.modules]
+        selected = [self.__select_file(task.template, task.path[len(self.out_dir):][1:]) for task in tasks]
+        rendered_tasks = [task for task, select in zip(tasks, selected) if select]
+
+        jobs = max(1, min(self.options.get_jobs(), len(rendered_tasks)))
+        loc_counts = []
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_render_worker, initargs=(models,)) as executor:
+            results = executor.map(render_task, rendered_tasks, chunksize=max(1, len(rendered_tasks) // (jobs * 4)))
+            for task, select in zip(tasks, selected):
+                if not select:
+                    self.generated_files.append(GeneratedFile(task.path[len(self.out_dir):][1:], task.disable, False))
+                    loc_counts.append(0)
+                    continue
+
+                path, text, seconds = next(results)
+                gen = path[len(self.out_dir):][1:]
+                self.generated_files.append(GeneratedFile(gen, task.disable))
+                self.logger.info("Generating {}".format(path))
+                self.profile.add_render_time(task.template, task.node_path, seconds)
+                self.output.write(gen, text)
+                loc_counts.append(count_lines(text))
+
+        return loc_counts
+
+    def __get_unity_groups(self) -> List[Tuple[str, List[str]]]:
+        """
+        Groups the compiled sources by their top-level Yang subtree, i.e. core/api/<module>/<node>, and splits the
+        groups into batches of at most unity_batch_size sources, each compiled as a single translation unit.
+        """
+        batch_size = self.config.get_build_configuration().get_unity_batch_size()
+
+        subtrees: Dict[str, List[str]] = {}
+        for entry in self.generated_files:
+            file = entry.get_file()
+            if file[-3:] != "cpp" or entry.get_disabled():
+                continue
+
+            parts = file.split("/")
+            if parts[:2] == ["core", "api"] and len(parts) > 4:
+                subtree = "/".join(parts[2:4])
+            elif parts[:2] == ["core", "api"] and len(parts) > 3:
+                subtree = parts[2]
+            else:
+                subtree = "plugin"
+            subtrees.setdefault(subtree, []).append(file)
+
+        groups = []
+        for subtree, files in subtrees.items():
+            for idx in range(0, len(files), batch_size):
+                groups.append(("{}_{}".format(to_c_variable(subtree.replace("/", "_")), idx // batch_size), files[idx:idx + batch_size]))
+
+        return groups
+
     def __generate_cmake_files(self):
+        build = self.config.get_build_configuration()
+
         # CMakeLists.txt
         # print(self.generated_files)
         self.__generate_file(
             "CMakeLists.txt", 
             module_name=self.config.get_name(),
             files=self.generated_files,
-            src_folder="")
+            src_folder="",
+            precompile_headers=self.PRECOMPILE_HEADERS if build.get_precompiled_headers() else [],
+            unity_groups=self.__get_unity_groups() if build.get_unity_build() else [])
 
     def generate_files(self):
         self.__generate_core_files()
         self.__generate_module_files()
         self.__generate_plugin_files()
-        self.__generate_api_files()
+        with self.profile.timer("generate API files"):
+            self.__generate_api_files()
         self.__generate_cmake_files()
-        
+    
         self.__generate_file(
             "main.cpp", 
             plugin_name=self.config.get_name())
 
-    def apply_formatting(self):
+    def __run_clang_format(self, files: List[str]) -> Dict[str, str]:
+        """
+        Formats a batch of files in place with a single clang-format call.
+
+        In case the batch fails then each file is formatted on its own to be able to report the errors per file.
+
+        Returns
+        -------
+        Dict[str, str]
+            Map of the files that failed to be formatted to the error output of clang-format.
+        """
+        params = ["clang-format", "-style=file", "-i"]
+        result = subprocess.run(params + files, capture_output=True, text=True)
+        if result.returncode == 0:
+            return {}
+
+        if len(files) == 1:
+            return {files[0]: result.stderr.strip()}
+
+        errors = {}
+        for file in files:
+            errors.update(self.__run_clang_format([file]))
+
+        return errors
+
+    def apply_formatting(self) -> List[str]:
         self.logger.info("Applying .clang-format style")
 
+        errors = {}
         if shutil.which("clang-format") is not None:
             self.logger.info("Running clang-format...")
-            # copy the used clang-format file into the source directory and apply it to all generated files
-            src_path = "templates/common/.clang-format"
-            dst_path = os.path.join(self.out_dir, ".clang-format")
-
-            shutil.copyfile(src_path, dst_path)
 
+            files = [entry.get_file() for entry in self.generated_files
+                     if entry.get_rendered() and entry.get_file()[-3:] in ["cpp", "hpp"]]
+
+            # files whose rendered text was formatted before are taken from the format cache
+            cache = None
+            keys = {}
+            if self.options.get_cache_dir():
+                cache = FormatCache(self.options.get_cache_dir(), self.options.get_format_cache_size())
+                style_key = cache.get_style_key(self.CLANG_FORMAT_FILE)
+                keys = {file: cache.get_key(style_key, file, self.output.read(file)) for file in files}
+
+                pending = []
+                for file in files:
+                    text = cache.load(keys[file])
+                    if text is None:
+                        pending.append(file)
+                    else:
+                        self.output.write(file, text)
+
+                self.logger.info("Formatted {} of {} files from cache".format(len(files) - len(pending), len(files)))
+                files = pending
+
+            # clang-format can't format several files from stdin in one call. Instead of starting it for each file,
+            # the files are formatted in batches in a local scratch directory, so that the output directory is only
+            # written once.
+            with tempfile.TemporaryDirectory(prefix="sysrepo-plugin-generator-") as scratch_dir:
+                scratch = FileSystemOutput(scratch_dir)
+                for file in files:
+                    scratch.make_dir(os.path.dirname(file))
+                    scratch.write(file, self.output.read(file))
+
+                scratch_errors = self.__format_directory(scratch_dir, files)
+                for file in files:
+                    path = scratch.get_path(file)
+                    if path in scratch_errors:
+                        errors[os.path.join(self.out_dir, file)] = scratch_errors[path]
+                    else:
+                        text = scratch.read(file)
+                        self.output.write(file, text)
+                        if cache:
+                            cache.store(keys[file], text)
+
+            if cache:
+                cache.evict()
+
+            for file, error in errors.items():
+                self.logger.error("Failed to format {}: {}".format(file, error))
+
+            self.logger.info("Finished!" if not errors else "Finished with {} formatting error(s)!".format(len(errors)))
+
+        return list(errors.keys())
+
+    def __format_directory(self, dir: str, files: List[str]) -> Dict[str, str]:
+        # copy the used clang-format file into the directory and apply it to the given files
+        shutil.copyfile(self.CLANG_FORMAT_FILE, os.path.join(dir, ".clang-format"))
+
+        paths = [os.path.join(dir, file) for file in files]
+
+        # Split the files into batches so that each worker gets a similar share, but start a new process at least every FORMAT_BATCH_SIZE files.
+        jobs = max(1, self.options.get_jobs())
+        batch_size = max(1, min(self.FORMAT_BATCH_SIZE, -(-len(paths) // jobs)))
+        batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+
+        errors = {}
+        if jobs == 1 or len(batches) <= 1:
+            for batch in batches:
+                errors.update(self.__run_clang_format(batch))
+        else:
+            with ThreadPoolExecutor(max_workers=min(jobs, len(batches))) as executor:
+                for batch_errors in executor.map(self.__run_clang_format, batches):
+                    errors.update(batch_errors)
+
+        return errors
+
+    def write_output(self):
+        if isinstance(self.output, ArchiveOutput):
+            # archives are only written once all files are formatted
+            self.output.close()
+            return
+
+        target = FileSystemOutput(self.out_dir)
+        if not self.options.get_incremental():
+            for dir in [""] + self.output.get_dirs():
+                target.make_dir(dir)
+
+            # the manifest of a previous run would be stale for a later incremental run
+            manifest = OutputManifest(self.out_dir)
             for entry in self.generated_files:
-                # run clang-format command
-                gen = entry.get_file()
-                if gen[-3:] == "cpp" or gen[-3:] == "hpp":
-                    # self.logger.info("Running clang-format on {}".format(gen))
-                    params = ["clang-format", "-style=file",
-                              os.path.join(self.out_dir, gen)]
-                    output = subprocess.check_output(params)
-                    with open(os.path.join(self.out_dir, gen), "wb") as out_file:
-                        out_file.write(output)
-            
-            self.logger.info("Finished!")
-
-            pathlib.Path(dst_path).unlink()
+                text = self.output.read(entry.get_file())
+                target.write(entry.get_file(), text)
+                manifest.set_hash(entry.get_file(), OutputManifest.hash_content(text.encode()))
+            manifest.save()
+
+            return
+
+        self.logger.info("Writing changed files into {}".format(self.out_dir))
+
+        os.makedirs(self.out_dir, exist_ok=True)
+
+        manifest = OutputManifest(self.out_dir)
+        manifest.load()
+        previous_files = manifest.get_files()
+
+        written = 0
+        unchanged = 0
+        new_manifest = OutputManifest(self.out_dir)
+        for entry in self.generated_files:
+            gen = entry.get_file()
+            path = target.get_path(gen)
+
+            # Files which weren't rendered are kept as they are. Missing files are rendered (see __select_file()),
+            # unless they were removed in the meantime, in which case they're left out of the manifest and rendered
+            # by the next run.
+            if not entry.get_rendered():
+                known_digest = OutputManifest.hash_file(path)
+                if known_digest is None:
+                    self.logger.warning("Generated file {} was removed during generation".format(gen))
+                    continue
+                new_manifest.set_hash(gen, known_digest)
+                unchanged += 1
+                continue
+
+            text = self.output.read(gen)
+            digest = OutputManifest.hash_content(text.encode())
+            new_manifest.set_hash(gen, digest)
+
+            # Keep the file (and its mtime) if its content on disk didn't change. The manifest isn't trusted here,
+            # since the file may have been edited since.
+            if OutputManifest.hash_file(path) == digest:
+                unchanged += 1
+                continue
+
+            target.make_dir(os.path.dirname(gen))
+            target.write(gen, text)
+            written += 1
+
+        # Remove files of Yang nodes that disappeared from the schema together with their then empty directories.
+        removed = 0
+        for gen in previous_files:
+            if gen in new_manifest.get_files():
+                continue
+
+            path = target.get_path(gen)
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+
+            dir = os.path.dirname(path)
+            while os.path.abspath(dir) != os.path.abspath(self.out_dir) and os.path.isdir(dir) and not os.listdir(dir):
+                os.rmdir(dir)
+                dir = os.path.dirname(dir)
+
+        new_manifest.save()
+
+        self.logger.info("Written: {}, unchanged: {}, removed: {}".format(written, unchanged, removed))
+
+    def log_profile(self, count: int):
+        self.logger.info("Phases:")
+        for name, values in self.phases.get_phases().items():
+            self.logger.info("| {:>9.3f}s | {}".format(values["wall"], name))
+
+        self.logger.info("Parts of the phases:")
+        for name, seconds in self.profile.get_timers().items():
+            self.logger.info("| {:>9.3f}s | {}".format(seconds, name))
+
+        self.logger.info("Slowest templates:")
+        for template, seconds, renders in self.profile.get_slowest_templates(count):
+            self.logger.info("| {:>9.3f}s | {:>5} files | {}".format(seconds, renders, template))
+
+        self.logger.info("Slowest Yang nodes:")
+        for node_path, seconds, renders in self.profile.get_slowest_nodes(count):
+            self.logger.info("| {:>9.3f}s | {:>5} files | {}".format(seconds, renders, node_path))
@@ -0,0 +1,270 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from libyang.schema import Node as LyNode
+from libyang.schema import SNode
+
+from core.node_filter import NodeFilter
+from core.utils import LibyangTreeFunction, normalize_data_path, to_c_variable, to_camel_case
+
+from .walkers.types import TypeResolver
+
+
+class KeyModel:
+    """
+    Key of a list as used in the key tuples and constructors of its list.
+
+    Attributes
+    ----------
+    name : str
+        Name of the key leaf.
+    var_name : str
+        C variable name of the key as constructor parameter of its list.
+    type : str
+        C++ type of the key.
+    basename : str
+        Yang base type of the key.
+    """
+
+    def __init__(self, list_name: str, key: SNode, key_type: str):
+        self.name: str = key.name()
+        self.var_name: str = to_c_variable(list_name + "-" + self.name)
+        self.type: str = key_type
+        self.basename: str = key.type().basename()
+
+
+class NodeModel:
+    """
+    Render model of a Yang node. It's built once per node and used by all templates of the node as well as by the
+    templates of its parent, so that the templates don't need to query the schema or resolve types themselves.
+
+    Attributes
+    ----------
+    node : SNode
+        The Yang node.
+    name : str
+        Name of the node.
+    var_name : str
+        C variable name of the node, e.g. used for its member m_<var_name> in the parent class.
+    camel_name : str
+        Class name of the node without the prefix of its parent.
+    module_name : str
+        Name of the module defining the node.
+    route_name : str
+        Name of the node from which its ID in a NodeRoute is computed (see GetNodeId), prefixed by its module name if
+        the module differs from the one of its parent.
+    request_path : str
+        Schema path of the node relative to its parent, including choices and cases, e.g. "ch/cs/leaf". Requests are
+        forwarded to the node if the requested schema path continues with it (see IsChildRequested).
+    nodetype : int
+        Libyang node type.
+    config_false : bool
+        Whether the node is state data.
+    is_key : bool
+        Whether the node is a list key leaf.
+    features : List[str]
+        Names of the features the node depends on.
+    optional : bool
+        Whether the node depends on features, i.e. it's only present if all of them are enabled.
+    type : Optional[str]
+        C++ type of a generated leaf or leaf-list.
+    basename : Optional[str]
+        Yang base type of a leaf or leaf-list.
+    defaults : List[Any]
+        Default values of a leaf-list.
+    user_ordered : bool
+        Whether a list or leaf-list is ordered-by user.
+    keys : List[KeyModel]
+        Keys of a list.
+    children : List[NodeModel]
+        Children of a container or list, except for deprecated ones.
+    has_children : bool
+        Whether a container or list has any children (including deprecated ones).
+    children_depth : int
+        Depth of the children of a generated node in the data tree, i.e. their index in a NodeRoute (0 for the
+        children of the root node of a module).
+    pull_cache_validity : Optional[int]
+        Validity period of the pull data cache of a generated state node in milliseconds, None if not configured.
+    storage : Optional[str]
+        Storage of the entries of a list, either an ordered "map" or a "hash" map.
+    """
+
+    def __init__(self, node: SNode, node_type: Optional[str], keys: List[KeyModel], children: List["NodeModel"], has_children: bool,
+                 children_depth: int = 0, pull_cache_validity: Optional[int] = None, storage: Optional[str] = None):
+        nodetype = node.nodetype()
+
+        self.node: SNode = node
+        self.name: str = node.name()
+        self.var_name: str = to_c_variable(self.name)
+        self.camel_name: str = to_camel_case(self.var_name, True)
+        self.module_name: str = node.module().name()
+        # the parent of a top-level node is the root node of its module, whose schema path is "/<module>"
+        parent = node.parent()
+        parent_path = parent.schema_path() if parent is not None else "/" + self.module_name
+        self.route_name: str = self.name if parent is None or parent.module().name() == self.module_name else self.module_name + ":" + self.name
+        self.request_path: str = node.schema_path()[len(parent_path) + 1:]
+        self.nodetype: int = nodetype
+        self.config_false: bool = node.config_false()
+        self.is_key: bool = nodetype == LyNode.LEAF and node.is_key()
+        self.features: List[str] = [feature.tree().feature().name() for feature in node.if_features()]
+        self.optional: bool = len(self.features) > 0
+        self.type: Optional[str] = node_type
+        self.basename: Optional[str] = node.type().basename() if nodetype in [LyNode.LEAF, LyNode.LEAFLIST] else None
+        self.defaults: List[Any] = list(node.defaults()) if nodetype == LyNode.LEAFLIST else []
+        self.user_ordered: bool = nodetype in [LyNode.LIST, LyNode.LEAFLIST] and node.ordered()
+        self.keys: List[KeyModel] = keys
+        self.children: List[NodeModel] = children
+        self.has_children: bool = has_children
+        self.children_depth: int = children_depth
+        self.pull_cache_validity: Optional[int] = pull_cache_validity
+        self.storage: Optional[str] = storage
+
+    def __get_reference(self) -> Tuple:
+        return (self.name, self.nodetype, self.module_name, self.route_name, self.request_path, self.config_false, self.is_key, tuple(self.features),
+                tuple((key.name, key.type, key.basename) for key in self.keys), self.storage)
+
+    def get_signature(self) -> Tuple:
+        """
+        Returns everything the templates use of the node, its children and its parents. The files of a node only need
+        to be rendered again if its signature changed.
+        """
+        node = self.node
+        parents = []
+        parent = node.get_parent()
+        while parent is not None:
+            parents.append((parent.name(), parent.nodetype(), parent.module().name()))
+            parent = parent.get_parent()
+
+        return (self.__get_reference(), node.data_path(), node.schema_path(), node.description(), node.parent() is None,
+                node.default() if self.nodetype == LyNode.LEAF else None, tuple(self.defaults), self.user_ordered, self.type, self.basename,
+                tuple(parents), tuple(child.__get_reference() for child in self.children), self.has_children, self.children_depth,
+                self.pull_cache_validity)
+
+
+class MemberModel:
+    """
+    Class of a leaf or leaf-list rendered into the files of its parent, see the subtree layout of ClassAPIWalker.
+
+    Attributes
+    ----------
+    model : NodeModel
+        Render model of the node.
+    class_name : str
+        Class name of the node.
+    parent_class_name : str
+        Class name of the parent node, whose files contain the class.
+    """
+
+    def __init__(self, model: NodeModel, class_name: str, parent_class_name: str):
+        self.model: NodeModel = model
+        self.class_name: str = class_name
+        self.parent_class_name: str = parent_class_name
+
+
+class RenderModelBuilder:
+    """
+    Builds the render models of all nodes of a class API walker tree.
+
+    Methods
+    -------
+    build(tree)
+        Returns the render models of the nodes of the tree, mapped by their data paths.
+    get_matched(option)
+        Returns the normalized XPaths of an option (pull_cache or list_storage) which matched a node.
+    get_kept_storages()
+        Returns the data paths of the lists which keep the map storage though the hash storage was configured.
+    """
+
+    def __init__(self, types: TypeResolver, node_filter: Optional[NodeFilter] = None, pull_cache: Optional[Dict[str, int]] = None,
+                 list_storage: Optional[Dict[str, str]] = None):
+        """
+        Parameters
+        ----------
+        types : TypeResolver
+            Type resolver of the module.
+        node_filter : Optional[NodeFilter]
+            Filter of the pruned nodes, which aren't children of their parents' models.
+        pull_cache : Optional[Dict[str, int]]
+            Validity periods of the pull data caches in milliseconds mapped by the XPaths of state nodes.
+        list_storage : Optional[Dict[str, str]]
+            Storages of the list entries mapped by the XPaths of lists, the map storage is used for other lists.
+        """
+
+        self.types: TypeResolver = types
+        self.node_filter: Optional[NodeFilter] = node_filter
+        self.pull_cache: Dict[str, int] = {normalize_data_path(xpath): validity for xpath, validity in (pull_cache or {}).items()}
+        self.list_storage: Dict[str, str] = {normalize_data_path(xpath): storage for xpath, storage in (list_storage or {}).items()}
+        # normalized XPaths of the options matching a node
+        self.matched: Dict[str, Set[str]] = {"pull_cache": set(), "list_storage": set()}
+        # lists for which the hash storage can't be used
+        self.kept_storages: List[str] = []
+        self.generated: Set[int] = set()
+        # Choices and cases aren't part of data paths, hence, models are mapped by node instead of by data path.
+        self.models: Dict[int, NodeModel] = {}
+
+    def build(self, tree: Dict[str, LibyangTreeFunction]) -> Dict[str, NodeModel]:
+        self.generated = {id(entry.node) for entry in tree.values()}
+
+        return {path: self.__get_model(entry.node) for path, entry in tree.items()}
+
+    def get_matched(self, option: str) -> Set[str]:
+        return self.matched[option]
+
+    def get_kept_storages(self) -> List[str]:
+        return self.kept_storages
+
+    def __get_model(self, node: SNode) -> NodeModel:
+        model = self.models.get(id(node))
+        if model is None:
+            model = self.__build_model(node)
+            self.models[id(node)] = model
+
+        return model
+
+    def __build_model(self, node: SNode) -> NodeModel:
+        nodetype = node.nodetype()
+
+        # Only nodes which are generated need their own type, children which are not generated (e.g. obsolete ones)
+        # are only referenced by their parent.
+        node_type = None
+        if nodetype in [LyNode.LEAF, LyNode.LEAFLIST] and id(node) in self.generated:
+            node_type = self.types.get_node_type(node)
+
+        keys = []
+        if nodetype == LyNode.LIST:
+            keys = [KeyModel(node.name(), key, self.types.get_key_type(key)) for key in node.keys()]
+
+        children = []
+        has_children = False
+        children_depth = 0
+        if nodetype in [LyNode.CONTAINER, LyNode.LIST]:
+            for child in node.children():
+                has_children = True
+                if not child.deprecated() and not (self.node_filter and self.node_filter.is_pruned(child)):
+                    children.append(self.__get_model(child))
+
+            # each segment of a data path is a data node, the root node of a module isn't
+            if id(node) in self.generated and node.get_parent() is not None:
+                children_depth = node.data_path().count("/")
+
+        pull_cache_validity = None
+        if self.pull_cache and id(node) in self.generated and node.config_false() and nodetype in [LyNode.CONTAINER, LyNode.LIST, LyNode.LEAF, LyNode.LEAFLIST] \
+                and not (nodetype == LyNode.LEAF and node.is_key()):
+            path = normalize_data_path(node.data_path())
+            pull_cache_validity = self.pull_cache.get(path)
+            if pull_cache_validity is not None:
+                self.matched["pull_cache"].add(path)
+
+        storage = None
+        if nodetype == LyNode.LIST:
+            path = normalize_data_path(node.data_path())
+            storage = self.list_storage.get(path, "map")
+            if path in self.list_storage:
+                self.matched["list_storage"].add(path)
+
+            # the entries of a hash map have no order and there's no hash of a bits key
+            if storage == "hash" and (node.ordered() or any(key.basename == "bits" for key in keys)):
+                if id(node) in self.generated:
+                    self.kept_storages.append(path)
+                storage = "map"
+
+        return NodeModel(node, node_type, keys, children, has_children, children_depth, pull_cache_validity, storage)
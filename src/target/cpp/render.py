@@ -0,0 +1,78 @@
+import time
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import jinja2
+
+from .model import MemberModel, NodeModel
+
+
+def create_jinja2_env() -> jinja2.Environment:
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(["templates/cpp/", "templates/cpp/utils/"]),
+        extensions=['jinja2.ext.loopcontrols'],
+        autoescape=jinja2.select_autoescape(),
+        trim_blocks=True,
+        lstrip_blocks=True
+    )
+
+
+def count_lines(text: str) -> int:
+    # Same as iterating over the lines of the written file in binary mode.
+    return text.count("\n") + (1 if text and not text.endswith("\n") else 0)
+
+
+class RenderTask:
+    """
+    Picklable description of a single file rendered for a Yang node.
+
+    The node itself is not part of the task, instead its render model is looked up by its data path in the models
+    of its module, which each worker process receives only once. The same holds for the members of the file, i.e.
+    the leafs and leaf-lists rendered into it, given by their data path, class name and parent class name.
+    """
+
+    def __init__(self, template: str, path: str, disable: bool, module_idx: int, node_path: str, kwargs: Dict[str, Any],
+                 member_paths: Optional[List[Tuple[str, str, str]]] = None):
+        self.template: str = template
+        self.path: str = path
+        self.disable: bool = disable
+        self.module_idx: int = module_idx
+        self.node_path: str = node_path
+        self.kwargs: Dict[str, Any] = kwargs
+        self.member_paths: List[Tuple[str, str, str]] = member_paths or []
+
+    def get_members(self, models: List[Dict[str, NodeModel]]) -> List[MemberModel]:
+        return [MemberModel(models[self.module_idx][path], class_name, parent_class_name)
+                for path, class_name, parent_class_name in self.member_paths]
+
+
+# Per worker process state, see init_render_worker().
+_worker_env: jinja2.Environment = None
+_worker_models: List[Dict[str, NodeModel]] = []
+
+
+def init_render_worker(models: List[Dict[str, NodeModel]]):
+    global _worker_env, _worker_models
+
+    _worker_env = create_jinja2_env()
+    _worker_models = models
+
+
+def render_task(task: RenderTask) -> Tuple[str, str, float]:
+    """
+    Renders the file of a render task in a worker process. The file is written by the generator's output backend.
+
+    Returns
+    -------
+    Tuple[str, str, float]
+        The path of the file, the rendered text and the render time in seconds.
+    """
+
+    model = _worker_models[task.module_idx][task.node_path]
+    template = _worker_env.get_template("{}.jinja2".format(task.template))
+
+    start = time.perf_counter()
+    text = template.render(task.kwargs, node=model.node, model=model, members=task.get_members(_worker_models))
+    seconds = time.perf_counter() - start
+
+    return task.path, text, seconds
@@ -1,8 +1,9 @@
 import os
-from typing import List
+from typing import List, Optional
 from libyang.schema import Node as LyNode
 from libyang.schema import SNode, Module
 
+from core.node_filter import NodeFilter
 from core.utils import LibyangTreeFunction, to_c_variable
 from core.walker import Walker
 
@@ -10,13 +11,12 @@ from core.walker import Walker
 class ClassAPIContext:
     def __init__(self, source_dir):
         self.source_dir = source_dir
-        self.extensions = ['cpp', 'hpp']
 
         # Yang tree enriched with some properties
         self.tree = {}
 
-        # mapping files to their context
-        self.file_map = {}
+        # files to generate for the tree, see ClassAPIWalker.get_plan()
+        self.plan = []
 
         self.types = {
             "unknown": None,
@@ -41,6 +41,52 @@ class ClassAPIContext:
             "int64": "int64_t",
         }
 
+class EmittedFile:
+    """
+    File to render for a Yang node.
+
+    Attributes
+    ----------
+    path : str
+        Output path of the file.
+    template : str
+        Template to render, without the .jinja2 extension.
+    disable : bool
+        Whether the file is disabled in the CMake build.
+    """
+
+    def __init__(self, path: str, template: str, disable: bool):
+        self.path: str = path
+        self.template: str = template
+        self.disable: bool = disable
+
+
+class EmissionEntry:
+    """
+    Entry of the emission plan, i.e. a Yang node with its output directory and files. In the subtree layout the entry
+    of a container or list also has members, i.e. its leaf and leaf-list children, whose classes are rendered into
+    the files of the entry.
+    """
+
+    def __init__(self, directory: str, files: List[EmittedFile], ctx: LibyangTreeFunction, members: Optional[List[LibyangTreeFunction]] = None):
+        self.directory: str = directory
+        self.files: List[EmittedFile] = files
+        self.ctx: LibyangTreeFunction = ctx
+        self.members: List[LibyangTreeFunction] = members or []
+
+    def get_directory(self) -> str:
+        return self.directory
+
+    def get_files(self) -> List[EmittedFile]:
+        return self.files
+
+    def get_ctx(self) -> LibyangTreeFunction:
+        return self.ctx
+
+    def get_members(self) -> List[LibyangTreeFunction]:
+        return self.members
+
+
 class RootNode():
     def __init__(self, module: Module):
         self.mod: Module = module
@@ -80,30 +126,48 @@ class RootNode():
         return []
     
 class ClassAPIWalker(Walker):
-    def __init__(self, prefix, skip_prefix_mode, root_nodes, source_dir):
+    """
+    Walks the Yang tree and plans the files of the class API.
+
+    The layout defines which files are generated:
+        - "node": a directory with a header, a source and a context header for each node (default),
+        - "subtree": the same for each container, list and RPC, whose files also contain the classes of their leaf
+          and leaf-list children.
+
+    Nodes pruned by the node filter are skipped including their subtrees.
+    """
+
+    LAYOUTS = ["node", "subtree"]
+
+    def __init__(self, prefix, skip_prefix_mode, root_nodes, source_dir, disable=False, layout="node", node_filter: Optional[NodeFilter] = None):
         super().__init__(root_nodes)
         self.ctx = ClassAPIContext(source_dir)
         self.prefix = prefix
         self.skip_prefix_mode = skip_prefix_mode
+        self.disable = disable
+        self.layout = layout
+        self.node_filter = node_filter
+
+    def __get_root(self, node) -> LibyangTreeFunction:
+        parent_path = "/" + node.module().name()
+        if not parent_path in self.ctx.tree:
+            # Add a config container as the root node owning all the top-level nodes
+            file_path = os.path.join(self.ctx.source_dir, "core", "api", node.module().name())
+            self.ctx.tree[parent_path] = LibyangTreeFunction(self.prefix, None, RootNode(node.module()), file_path)
+
+        return self.ctx.tree[parent_path]
 
     def walk_node(self, node, depth):
 
         if node.parent():
             parent = self.ctx.tree[node.parent().data_path()]
         else:
-            parent_path = "/" + node.module().name()
-            if not parent_path in self.ctx.tree:
-                # Add a config container as the root node owning all the top-level nodes
-                file_path = os.path.join(self.ctx.source_dir, "core", "api", node.module().name())
-                self.ctx.tree[parent_path] = LibyangTreeFunction(self.prefix, None, RootNode(node.module()), file_path)
-                self.ctx.file_map[file_path] = parent_path
-            
-            parent = self.ctx.tree[parent_path]
+            parent = self.__get_root(node)
             # This node is under the top-level node, add it as a child
             parent.node.add_child(node)
 
-        # Add custom function to get the desired parent also for the top-level nodes (for which parent() returns None)
-        node.get_parent = lambda: parent.node
+        # Set the desired parent also for the top-level nodes (for which parent() returns None), see get_parent()
+        node.api_parent = parent.node
 
         file_path = os.path.join(parent.file_path, node.name())
         if self.skip_prefix_mode == "all":
@@ -115,34 +179,46 @@ class ClassAPIWalker(Walker):
         entry = LibyangTreeFunction(prefix, parent.prefix if parent != None else None, node, file_path)
 
         self.ctx.tree[node.data_path()] = entry
-        self.ctx.file_map[file_path] = node.data_path()
 
         return False
 
     def add_node(self, node):
+        if self.node_filter and self.node_filter.is_pruned(node):
+            if not node.parent():
+                # the root node is generated even if all top-level nodes are pruned
+                self.__get_root(node)
+            return False
+
         return not node.deprecated() and not node.obsolete() and not node.nodetype() in [LyNode.NOTIF, LyNode.ACTION]
 
+    def __is_member(self, entry: LibyangTreeFunction) -> bool:
+        return self.layout == "subtree" and entry.node.nodetype() in [LyNode.LEAF, LyNode.LEAFLIST]
+
+    def on_finish(self):
+        # leafs and leaf-lists rendered into the files of their parents, mapped by the directories of the parents
+        members = {}
+        for entry in self.ctx.tree.values():
+            if self.__is_member(entry):
+                members.setdefault(os.path.dirname(entry.file_path), []).append(entry)
+
+        for idx, entry in enumerate(self.ctx.tree.values()):
+            if self.__is_member(entry):
+                continue
+
+            name = entry.node.name()
+            # disable the cmake build of a disabled module except for the source of its root node
+            files = [
+                EmittedFile(os.path.join(entry.file_path, name + ".cpp"), "core/api/class.cpp", self.disable if idx != 0 else False),
+                EmittedFile(os.path.join(entry.file_path, name + ".hpp"), "core/api/class.hpp", self.disable),
+                EmittedFile(os.path.join(entry.file_path, name + "-ctx.hpp"), "core/api/class-ctx.hpp", self.disable),
+            ]
+            self.ctx.plan.append(EmissionEntry(entry.file_path, files, entry, members.get(entry.file_path, [])))
+
+    def get_plan(self) -> List[EmissionEntry]:
+        return self.ctx.plan
+
     def get_directories(self):
-        dirs = []
-        for key,entry in self.ctx.tree.items():
-            if not entry.file_path in dirs:
-                dirs.append(entry.file_path)
-
-        return dirs
-
-    def get_api_filenames(self):
-        files = []
-        for key,entry in self.ctx.tree.items():
-            for ext in self.ctx.extensions:
-                files.append(os.path.join(entry.file_path, entry.node.name() + "." + ext))
-            files.append(os.path.join(entry.file_path, entry.node.name() + "-ctx.hpp"))
-
-        return files
-
-    def get_file_ctx(self, file):
-        file_path = os.path.split(file)[0]
-        xpath = self.ctx.file_map[file_path]
-        return self.ctx.tree[xpath]
+        return list(dict.fromkeys(entry.get_directory() for entry in self.ctx.plan))
 
     def get_types(self):
         return self.ctx.types
@@ -1,28 +1,13 @@
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from libyang.schema import Node as LyNode
 
-from core.utils import to_c_variable
+from core.node_filter import NodeFilter
+from core.utils import to_c_variable, to_camel_case
 from core.walker import Walker
 
 from libyang.schema import SNode
 
 
-class Typedef:
-    def __init__(self, type, name):
-        self.type = type
-        self.name = name
-        self.typedef = "{}_t".format(name)
-
-    def get_type(self):
-        return self.type
-
-    def get_name(self):
-        return self.name
-
-    def get_typedef(self):
-        return self.typedef
-
-
 class Def:
     def __init__(self, name, path):
         self.name: str = name
@@ -35,42 +20,6 @@ class Def:
         return self.path
 
 
-class VarDef(Def):
-    def __init__(self, type, name, path, kind):
-        super().__init__(name, path)
-        self.type = type
-        self.kind = kind
-
-    def get_type(self):
-        return self.type
-
-    def get_kind(self):
-        return self.kind
-
-
-class StructDef(Def):
-    vars: List[VarDef]
-
-    def __init__(self, name, path):
-        super().__init__(name, path)
-        self.vars = []
-
-    def add_var(self, vd: VarDef):
-        self.vars.append(vd)
-
-    def get_vars(self):
-        return self.vars
-
-    def __str__(self):
-        return "StructDef: {}".format(self.name)
-
-    def __repr__(self):
-        return str(self)
-
-    def reverse_vars(self):
-        self.vars.reverse()
-
-
 class EnumValue():
     def __init__(self, name, value):
         self.name: str = name
@@ -93,9 +42,6 @@ class EnumDef(Def):
     def get_values(self):
         return self.values
 
-    def reverse_values(self):
-        self.values.reverse()
-
 
 class BitValue():
     def __init__(self, name, value):
@@ -119,9 +65,6 @@ class BitDef(Def):
     def get_values(self):
         return self.values
 
-    def reverse_values(self):
-        self.values.reverse()
-
 
 class UnionType():
     def __init__(self, name, type):
@@ -145,9 +88,6 @@ class UnionDef(Def):
     def get_types(self):
         return self.types
 
-    def reverse_values(self):
-        self.types.reverse()
-
 
 class TypesContext:
     """
@@ -157,397 +97,214 @@ class TypesContext:
     ----------
     prefix : str
         Plugin prefix.
-    parent_stack : Dict[int, str]
-        Parent stack for the current tree.
-    structs : List[StructDef]
-        List of structure definitions.
-    enums : List[EnumDef]
-        List of enum definitions.
-    typedefs: List[Typedef]
-        List of typedefs.
-    types_map: Dict[str, Def]
-        Map of type names to their definitions.
+    unions : Dict[str, UnionDef]
+        Map of union names to their definitions.
+    enums : Dict[str, EnumDef]
+        Map of enum names to their definitions.
+    bits : Dict[str, BitDef]
+        Map of bits names to their definitions.
+    collisions: List[Tuple[Def, Def]]
+        Pairs of the kept and the dropped definition for each name that was defined differently more than once.
     """
     prefix: str
-    parent_stack: Dict[int, str]
-    structs: List[StructDef]
-    unions: List[UnionDef]
-    enums: List[EnumDef]
-    bits: List[BitDef]
-    typedefs: List[Typedef]
-    types_map: Dict[str, Def]
+    unions: Dict[str, UnionDef]
+    enums: Dict[str, EnumDef]
+    bits: Dict[str, BitDef]
+    collisions: List[Tuple[Def, Def]]
 
     def __init__(self, prefix: str):
         self.prefix = prefix
-        self.parent_stack = {}
-        self.structs: List[StructDef] = []
-        self.unions: List[UnionDef] = []
-        self.enums: List[EnumDef] = []
-        self.bits: List[BitDef] = []
-        self.typedefs: List[Typedef] = []
-        self.types_map = {}
+        self.unions: Dict[str, UnionDef] = {}
+        self.enums: Dict[str, EnumDef] = {}
+        self.bits: Dict[str, BitDef] = {}
+        self.collisions = []
 
     def get_prefix(self):
         return self.prefix
 
-    def add_struct(self, sd: StructDef):
-        self.structs.append(sd)
+    def __add_symbol(self, symbols: Dict[str, Def], d: Def, values: Callable[[Def], List[Any]]):
+        # The same typedef used by several nodes is defined only once. The first definition wins in case of a collision.
+        if d.name not in symbols:
+            symbols[d.name] = d
+        elif values(symbols[d.name]) != values(d):
+            self.collisions.append((symbols[d.name], d))
 
     def add_union(self, ud: UnionDef):
-        self.unions.append(ud)
+        self.__add_symbol(self.unions, ud, lambda d: [(t.name, t.type) for t in d.types])
 
     def add_enum(self, ed: EnumDef):
-        if not any(enum.name == ed.name for enum in self.enums):
-            self.enums.append(ed)
+        self.__add_symbol(self.enums, ed, lambda d: [(v.name, v.value) for v in d.values])
 
     def add_bits(self, ed: BitDef):
-        if not any(bit.name == ed.name for bit in self.bits):
-            self.bits.append(ed)
-
-    def add_typedef(self, d: Def, td: Typedef):
-        self.typedefs.append(td)
-        self.types_map[d.get_name()] = d
-
-    def parent_exists(self, parent: str) -> bool:
-        return parent in self.types_map
-
-    def add_var(self, parent: str, vd: VarDef):
-        if self.parent_exists(parent) and type(self.types_map[parent]) == StructDef:
-            self.types_map[parent].add_var(vd)
-        else:
-            raise KeyError("Parent {} not found".format(parent))
-
-    def push_parent(self, depth: int, node_name: str):
-        self.parent_stack[depth] = node_name
-
-    def get_parent(self, depth: int) -> str:
-        return self.parent_stack[depth-1]
+        self.__add_symbol(self.bits, ed, lambda d: [(v.name, v.value) for v in d.values])
 
-    def reverse_structs(self):
-        self.structs.reverse()
+    def has_type(self, name: str) -> bool:
+        return name in self.enums or name in self.bits or name in self.unions
 
-        for s in self.structs:
-            s.reverse_vars()
 
-    def reverse_typedefs(self):
-        self.typedefs.reverse()
-
-    def reverse_enums(self):
-        self.enums.reverse()
-
-        for e in self.enums:
-            e.reverse_values()
-
-    def reverse_bits(self):
-        self.bits.reverse()
-
-        for e in self.bits:
-            e.reverse_values()
-
-    def reverse_unions(self):
-        self.unions.reverse()
-
-        for e in self.unions:
-            e.reverse_values()
+def get_type_name(node) -> str:
+    # As name use the node name if it's a native type, otherwise, use node type name (after the optional ':') to make sure that types are only defined once
+    name = node.name() if node.type().name() == node.type().basename() else node.type().name()
+    if ":" in name:
+        name = name.split(":")[1]
+    return name
 
 
 class TypesWalker(Walker):
-    def __init__(self, prefix, root_nodes):
+    """
+    Collects the enums, bits and unions of all leafs and leaf-lists, which are generated into the types header.
+    Nodes pruned by the node filter are skipped including their subtrees.
+    """
+
+    def __init__(self, prefix, root_nodes, node_filter: Optional[NodeFilter] = None):
         super().__init__(root_nodes)
         self.ctx = TypesContext(prefix)
+        self.node_filter = node_filter
 
-    def get_parent_name(self, depth: int) -> str:
-        return to_c_variable("{}_{}".format(
-            self.ctx.get_prefix(), self.ctx.get_parent(depth)))
-    
     def get_type_name(self, node):
-        # As name use the node name if it's a native type, otherwise, use node type name (after the optional ':') to make sure that types are only defined once
-        name = node.name() if node.type().name() == node.type().basename() else node.type().name()
-        if ":" in name:
-            name = name.split(":")[1] 
-        return name
+        return get_type_name(node)
 
     def walk_node(self, node: SNode, depth: int):
-        if node.nodetype() == LyNode.CONTAINER:
-            self.ctx.push_parent(depth, node.name())
-
-            struct_name = to_c_variable(
-                "{}_{}".format(self.ctx.get_prefix(), node.name()))
-            var_name = to_c_variable(node.name())
-
-            td = Typedef("struct", struct_name)
-            sd = StructDef(struct_name, node.data_path())
-
-            self.ctx.add_struct(sd)
-            self.ctx.add_typedef(sd, td)
-
-            if depth > 0:
-                parent = self.get_parent_name(depth)
-
-                assert (self.ctx.parent_exists(parent))
-
-                # add var def to the parent
-                self.ctx.add_var(parent, VarDef(
-                    td.get_typedef(), var_name, node.data_path(), "struct"))
-        elif node.nodetype() == LyNode.LEAF:
-            # print("{} {}".format(node.type().basename(), node.name()))
-
-            if node.type().basename() == "union":
-                # add union type
-                union_name = self.get_type_name(node)
-
-                union_ed = UnionDef(union_name, node.data_path(),
-                    [UnionType(str(t), t.basename()) for t in node.type().union_types(True)])
-                union_td = Typedef("union", union_name)
-
-                self.ctx.add_union(union_ed)
-                self.ctx.add_typedef(union_ed, union_td)
-
-                assert (depth > 0)
-
-                parent = self.get_parent_name(depth)
-
-                assert (self.ctx.parent_exists(parent))
-
-                self.ctx.add_var(parent, VarDef(
-                    union_td.typedef, to_c_variable(node.name()), node.data_path(), "union"))
-
-            elif node.type().basename() == "enumeration":
-                # add enum type
-                enum_name = self.get_type_name(node)
-
-                enum_ed = EnumDef(enum_name, node.data_path(),
-                    [EnumValue(str(e), e.position()) for e in node.type().enums()])
-                enum_td = Typedef("enum", enum_name)
-
-                self.ctx.add_enum(enum_ed)
-                self.ctx.add_typedef(enum_ed, enum_td)
-
-                assert (depth > 0)
-
-                parent = self.get_parent_name(depth)
-
-                assert (self.ctx.parent_exists(parent))
-
-                self.ctx.add_var(parent, VarDef(
-                    enum_td.typedef, to_c_variable(node.name()), node.data_path(), "enum"))
-            
-            elif node.type().basename() == "bits":
-                # add bits type as an enum
-                bits_name = self.get_type_name(node)
-
-                bits_ed = BitDef(bits_name, node.data_path(),
-                    [BitValue(str(e), e.position()) for e in node.type().bits()])
-                bits_td = Typedef("enum", bits_name)
-
-                self.ctx.add_bits(bits_ed)
-                self.ctx.add_typedef(bits_ed, bits_td)
-
-                assert (depth > 0)
+        if node.nodetype() in [LyNode.LEAF, LyNode.LEAFLIST]:
+            node_type = node.type()
+            basename = node_type.basename()
+
+            if basename == "union":
+                self.ctx.add_union(UnionDef(self.get_type_name(node), node.data_path(),
+                    [UnionType(str(t), t.basename()) for t in node_type.union_types(True)]))
+            elif basename == "enumeration":
+                self.ctx.add_enum(EnumDef(self.get_type_name(node), node.data_path(),
+                    [EnumValue(str(e), e.position()) for e in node_type.enums()]))
+            elif basename == "bits":
+                # bits are generated as an enum
+                self.ctx.add_bits(BitDef(self.get_type_name(node), node.data_path(),
+                    [BitValue(str(e), e.position()) for e in node_type.bits()]))
 
-                parent = self.get_parent_name(depth)
-
-                assert (self.ctx.parent_exists(parent))
-
-                self.ctx.add_var(parent, VarDef(
-                    bits_td.typedef, to_c_variable(node.name()), node.data_path(), "enum"))
-                
-            else:
-                # previous value has to be a struct of some kind
-
-                assert (depth > 0)
-
-                parent = self.get_parent_name(depth)
-
-                assert (self.ctx.parent_exists(parent))
-
-                self.ctx.add_var(parent, VarDef(
-                    node.type().basename(), to_c_variable(node.name()), node.data_path(), "var"))
-
-        elif node.nodetype() == LyNode.LEAFLIST:
-            struct_name = to_c_variable(
-                "{}_{}".format(self.ctx.get_prefix(), node.name()))
-            var_name = to_c_variable(node.name())
-
-            # element struct
-            element_name = to_c_variable("{}_element".format(struct_name))
-            element_var_name = to_c_variable(node.name())
-
-            # element
-            element_td = Typedef("struct", element_name)
-            element_sd = StructDef(element_name, node.data_path())
-
-            # data
-            data_td = Typedef("struct", struct_name)
-            data_sd = StructDef(struct_name, node.data_path())
-
-            # add struct variables - data element + pointer to the next node
-            element_sd.add_var(
-                VarDef(data_td.typedef, element_var_name, node.data_path(), "var"))
-            element_sd.add_var(VarDef(element_td.typedef + "*", "next", node.data_path(), "var"))
-
-            self.ctx.add_struct(element_sd)
-            self.ctx.add_typedef(element_sd, element_td)
-
-            self.ctx.add_struct(data_sd)
-            self.ctx.add_typedef(data_sd, data_td)
-
-            self.ctx.typedefs.append(element_td)
-            self.ctx.structs.append(element_sd)
-
-            # add data variable to the data struct
-            if node.type().basename() == "union":
-                # add union type
-                union_name = self.get_type_name(node)
-
-                union_ed = UnionDef(union_name, node.data_path(),
-                    [UnionType(str(t), t.basename()) for t in node.type().union_types(True)])
-                union_td = Typedef("union", union_name)
-
-                self.ctx.add_union(union_ed)
-                self.ctx.add_typedef(union_ed, union_td)
-
-                assert (depth > 0)
-
-                parent = self.get_parent_name(depth)
-
-                assert (self.ctx.parent_exists(parent))
-
-                self.ctx.add_var(parent, VarDef(
-                    union_td.typedef, to_c_variable(node.name()), node.data_path(), "union"))
-
-            elif node.type().basename() == "enumeration":
-                # add enum type
-                enum_name = self.get_type_name(node)
-
-                enum_ed = EnumDef(enum_name, node.data_path(),
-                    [EnumValue(str(e), e.position()) for e in node.type().enums()])
-                enum_td = Typedef("enum", enum_name)
-
-                self.ctx.add_enum(enum_ed)
-                self.ctx.add_typedef(enum_ed, enum_td)
-
-                assert (depth > 0)
-
-                parent = self.get_parent_name(depth)
-
-                assert (self.ctx.parent_exists(parent))
+        return False
 
-                self.ctx.add_var(parent, VarDef(
-                    enum_td.typedef, to_c_variable(node.name()), node.data_path(), "enum"))
-                
-            elif node.type().basename() == "bits":
-                # add bits type as an enum
-                bits_name = self.get_type_name(node)
+    def add_node(self, node):
+        return not node.nodetype() in [LyNode.RPC, LyNode.ACTION, LyNode.NOTIF] and not (self.node_filter and self.node_filter.is_pruned(node))
 
-                bits_ed = BitDef(bits_name, node.data_path(),
-                    [BitValue(str(e), e.position()) for e in node.type().bits()])
-                bits_td = Typedef("enum", bits_name)
+    def get_enums(self) -> List[EnumDef]:
+        return list(self.ctx.enums.values())
+    
+    def get_bits(self) -> List[BitDef]:
+        return list(self.ctx.bits.values())
+    
+    def get_unions(self) -> List[UnionDef]:
+        return list(self.ctx.unions.values())
 
-                self.ctx.add_bits(bits_ed)
-                self.ctx.add_typedef(bits_ed, bits_td)
+    def get_enum(self, name) -> Optional[EnumDef]:
+        return self.ctx.enums.get(name)
+    
+    def get_bit(self, name) -> Optional[BitDef]:
+        return self.ctx.bits.get(name)
+    
+    def get_union(self, name) -> Optional[UnionDef]:
+        return self.ctx.unions.get(name)
 
-                assert (depth > 0)
+    def get_collisions(self) -> List[Tuple[Def, Def]]:
+        return self.ctx.collisions
 
-                parent = self.get_parent_name(depth)
 
-                assert (self.ctx.parent_exists(parent))
+class TypeResolver:
+    """
+    Resolves the C++ types of leafs, leaf-lists and list keys. Each type is resolved only once per node.
+
+    The types are tried in the following order:
+        - custom user types
+        - enums, bits and unions from the Yang model
+        - generic types from the class API walker
+
+    Methods
+    -------
+    get_node_type(node)
+        Returns the C++ type of a leaf or leaf-list.
+    get_key_type(key)
+        Returns the C++ type of a list key as used in the key tuples of its list.
+    """
 
-                self.ctx.add_var(parent, VarDef(
-                    bits_td.typedef, to_c_variable(node.name()), node.data_path(), "enum"))
-                
+    def __init__(self, symbols: TypesContext, user_types: Dict[str, str], static_types: Dict[str, Optional[str]], namespace: str):
+        """
+        Parameters
+        ----------
+        symbols : TypesContext
+            Enums, bits and unions found by the types walker.
+        user_types : Dict[str, str]
+            Custom user types from the configuration.
+        static_types : Dict[str, Optional[str]]
+            Mapping of Yang base types to C++ types.
+        namespace : str
+            Namespace of the generated enums, bits and unions.
+        """
+
+        self.symbols: TypesContext = symbols
+        self.user_types: Dict[str, str] = user_types
+        self.static_types: Dict[str, Optional[str]] = static_types
+        self.namespace: str = namespace
+        self.node_types: Dict[str, str] = {}
+        self.key_types: Dict[str, str] = {}
+
+    def __get_symbol_type(self, name: str) -> str:
+        return self.namespace + "::" + to_camel_case(to_c_variable(name), True)
+
+    def get_node_type(self, node) -> str:
+        path = node.data_path()
+        if path in self.node_types:
+            return self.node_types[path]
+
+        node_type = node.type()
+        type_name = get_type_name(node)
+        known_name = type_name if self.symbols.has_type(type_name) else None
+
+        # First try the type name, then its basename and finally the node name (e.g. for finding an enumeration).
+        result = None
+        for name in [type_name, node_type.basename(), node.name()]:
+            if node_type.basename() == "leafref":
+                name = node_type.leafref_type().name()
+
+            if name in self.user_types:
+                result = self.user_types[name]
+            elif name == known_name:
+                result = self.__get_symbol_type(name)
+                if node_type.basename() == "bits":
+                    result = "magic_enum::containers::set<" + result + ">"
+            elif name in self.static_types:
+                result = self.static_types[name]
+
+            if result is not None:
+                break
+
+        if result is None:
+            raise ValueError("Type '{}' maps to unknown type (base: '{}') in leaf: {}".format(node_type.name(), node_type.basename(), path))
+
+        self.node_types[path] = result
+        return result
+
+    def get_key_type(self, key) -> str:
+        path = key.data_path()
+        if path in self.key_types:
+            return self.key_types[path]
+
+        key_type = key.type()
+        type_name = get_type_name(key)
+        known_name = type_name if self.symbols.has_type(type_name) else None
+
+        # First try the key's type name, then its basename and finally the key name (e.g. for finding an enumeration).
+        result = None
+        for name in [key_type.name(), key_type.basename(), key.name()]:
+            if name in self.user_types:
+                result = self.user_types[name]
+            elif name == known_name:
+                result = self.__get_symbol_type(name)
             else:
-                # previous value has to be a struct of some kind
-
-                assert (depth > 0)
-
-                parent = self.get_parent_name(depth)
-
-                assert (self.ctx.parent_exists(parent))
-
-                self.ctx.add_var(parent, VarDef(
-                    node.type().basename(), to_c_variable(node.name()), node.data_path(), "var"))
-
-            # add to parent struct
-            assert (depth > 0)
-
-            parent = self.get_parent_name(depth)
-
-            assert (self.ctx.parent_exists(parent))
-
-            # add var def to the parent
-            self.ctx.add_var(parent, VarDef(
-                element_td.get_typedef() + "*", var_name, node.data_path(), "var"))
-
-        elif node.nodetype() == LyNode.LIST:
-            self.ctx.push_parent(depth, node.name())
-
-            struct_name = to_c_variable(
-                "{}_{}".format(self.ctx.get_prefix(), node.name()))
-            var_name = to_c_variable(node.name())
-
-            # element struct
-            element_name = to_c_variable("{}_element".format(struct_name))
-            element_var_name = to_c_variable(node.name())
-
-            # element
-            element_td = Typedef("struct", element_name)
-            element_sd = StructDef(element_name, node.data_path())
+                result = self.static_types.get(key_type.basename())
 
-            # data
-            data_td = Typedef("struct", struct_name)
-            data_sd = StructDef(struct_name, node.data_path())
+            if result is not None:
+                break
 
-            # add struct variables - data element + pointer to the next node
-            element_sd.add_var(
-                VarDef(data_td.typedef, element_var_name, node.data_path(), "var"))
-            element_sd.add_var(VarDef(element_td.typedef + "*", "next", node.data_path(), "var"))
+        if result is None:
+            raise ValueError("Key type {} is unknown (base: {}) in key: {}".format(key_type.name(), key_type.basename(), path))
 
-            self.ctx.add_struct(element_sd)
-            self.ctx.add_typedef(element_sd, element_td)
-
-            self.ctx.add_struct(data_sd)
-            self.ctx.add_typedef(data_sd, data_td)
-
-            self.ctx.typedefs.append(element_td)
-            self.ctx.structs.append(element_sd)
-
-            if depth > 0:
-                parent = self.get_parent_name(depth)
-
-                assert (self.ctx.parent_exists(parent))
-
-                # add var def to the parent
-                self.ctx.add_var(parent, VarDef(
-                    element_td.get_typedef() + "*", var_name, node.data_path(), "var"))
-
-        return False
-
-    def add_node(self, node):
-        return not node.nodetype() in [LyNode.RPC, LyNode.ACTION, LyNode.NOTIF]
-
-    def get_enums(self) -> List[EnumDef]:
-        return self.ctx.enums
-    
-    def get_bits(self):
-        return self.ctx.bits
-    
-    def get_unions(self):
-        return self.ctx.unions
-
-    def get_enum(self, name):
-        enums = list(filter(lambda enum: enum.name == name, self.ctx.enums))
-        return enums[0] if len(enums) > 0 else None
-    
-    def get_bit(self, name):
-        bits = list(filter(lambda bit: bit.name == name, self.ctx.bits))
-        return bits[0] if len(bits) > 0 else None
-    
-    def get_union(self, name):
-        unions = list(filter(lambda union: union.name == name, self.ctx.unions))
-        return unions[0] if len(unions) > 0 else None
-
-    def on_finish(self):
-        self.ctx.reverse_structs()
-        # self.ctx.reverse_enums()
-        self.ctx.reverse_typedefs()
+        self.key_types[path] = result
+        return result
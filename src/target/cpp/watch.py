@@ -0,0 +1,217 @@
+import logging
+import os
+
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import jinja2
+import jinja2.meta
+
+from core.config import GeneratorOptions
+from core.context_pool import LibyangContextPool
+from core.watch import FileWatcher
+
+from .batch import PluginJob, PluginResult, run_generator
+from .generator import CPPGenerator
+from .render import create_jinja2_env
+
+
+class WatchSession:
+    """
+    Generates a plugin and regenerates it whenever its Yang modules, its configuration or the templates change.
+
+    The libyang context and the Jinja2 environment are kept between the runs. Only files affected by a change are
+    rendered again:
+        - a changed template renders all files of that template and of the templates importing or including it,
+        - changed Yang modules render the files of nodes whose render model changed, see NodeModel.get_signature(),
+          and the types of a module whose enums, bits or unions changed,
+        - CMakeLists.txt is rendered when the list of generated files changed,
+        - a changed configuration or clang-format style renders all files.
+
+    All other files are kept as they are in the output directory.
+
+    Methods
+    -------
+    generate(templates, yang_changed)
+        Generates the plugin, either completely or only the files affected by the changes.
+    run(interval)
+        Generates the plugin and regenerates it on each change until interrupted.
+    """
+
+    def __init__(self, config_file: str, yang_dir: str, out_dir: str, options: GeneratorOptions, profile_top: Optional[int] = None):
+        self.config_file: str = config_file
+        self.yang_dir: str = yang_dir
+        self.out_dir: str = out_dir
+        # files which aren't rendered are kept in the output directory, which needs the incremental mode
+        self.options: GeneratorOptions = GeneratorOptions(options.get_jobs(), True, options.get_parallel_render(), options.get_cache_dir(),
+                                                          options.get_only(), options.get_archive(), options.get_format_cache_size())
+        self.profile_top: Optional[int] = profile_top
+
+        self.logger: logging.Logger = logging.getLogger("Watch")
+        self.logger.setLevel(logging.INFO)
+        self.logger.handlers.clear()
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('[%(levelname)s][%(name)s]: %(message)s'))
+        self.logger.addHandler(handler)
+
+        self.jinja_env: jinja2.Environment = create_jinja2_env()
+        self.context_pool: LibyangContextPool = LibyangContextPool()
+
+        # state of the previous run
+        self.signatures: Dict[str, Tuple] = {}
+        self.cmake_files: List[Tuple[str, bool]] = []
+
+    def __get_signatures(self, generator: CPPGenerator) -> Dict[str, Tuple]:
+        signatures = {}
+        for module in generator.modules:
+            types_file = os.path.join("core", "api", module.get_name(), "types.hpp")
+            signatures[types_file] = (
+                tuple((d.get_name(), tuple((v.name, v.value) for v in d.get_values())) for d in module.types_walker.get_enums()),
+                tuple((d.get_name(), tuple((v.name, v.value) for v in d.get_values())) for d in module.types_walker.get_bits()),
+                tuple((d.get_name(), tuple((t.name, t.type) for t in d.get_types())) for d in module.types_walker.get_unions()),
+            )
+
+            for entry in module.class_api_walker.get_plan():
+                ctx = entry.get_ctx()
+                signature = (module.get_name(), module.get_disable(), module.get_skip_prefix_mode(), ctx.prefix, ctx.parent_prefix,
+                             module.render_models[ctx.node.data_path()].get_signature(),
+                             tuple((member.prefix, member.parent_prefix, module.render_models[member.node.data_path()].get_signature())
+                                   for member in entry.get_members()))
+                for file in entry.get_files():
+                    signatures[os.path.relpath(file.path, generator.out_dir)] = signature
+
+        return signatures
+
+    @staticmethod
+    def __get_cmake_files(generator: CPPGenerator) -> List[Tuple[str, bool]]:
+        # the files listed in CMakeLists.txt are the ones generated before it
+        files = []
+        for entry in generator.generated_files:
+            if entry.get_file() == "CMakeLists.txt":
+                break
+            files.append((entry.get_file(), entry.get_disabled()))
+
+        return files
+
+    def __get_affected_templates(self, templates: Set[str]) -> Set[str]:
+        # map each template to the templates importing or including it
+        dependents: Dict[str, Set[str]] = {}
+        for name in self.jinja_env.list_templates(extensions=["jinja2"]):
+            try:
+                source = self.jinja_env.loader.get_source(self.jinja_env, name)[0]
+                references = jinja2.meta.find_referenced_templates(self.jinja_env.parse(source))
+            except jinja2.TemplateError:
+                # reported when rendering it
+                continue
+
+            for reference in references:
+                if reference is not None:
+                    dependents.setdefault(reference, set()).add(name)
+
+        affected = set()
+        stack = list(templates)
+        while stack:
+            name = stack.pop()
+            if name not in affected:
+                affected.add(name)
+                stack.extend(dependents.get(name, []))
+
+        return {name[:-len(".jinja2")] for name in affected}
+
+    def __create_filter(self, generator: CPPGenerator, templates: Set[str], yang_changed: bool,
+                        signatures: Dict[str, Tuple]) -> Callable[[str, str], bool]:
+        def render_filter(template: str, file: str) -> bool:
+            if template in templates or not os.path.exists(os.path.join(self.out_dir, file)):
+                return True
+
+            if file == "CMakeLists.txt":
+                return self.__get_cmake_files(generator) != self.cmake_files
+
+            return yang_changed and file in signatures and signatures[file] != self.signatures.get(file)
+
+        return render_filter
+
+    def generate(self, templates: Optional[Set[str]] = None, yang_changed: bool = False) -> PluginResult:
+        """
+        Parameters
+        ----------
+        templates : Optional[Set[str]]
+            Names of the changed templates relative to the template directories or None to generate all files.
+        yang_changed : bool
+            Whether Yang modules changed.
+        """
+        job = PluginJob(os.path.splitext(os.path.basename(self.config_file))[0], self.config_file, self.out_dir)
+        generator = CPPGenerator(self.yang_dir, self.out_dir, job.get_config(), self.options, self.context_pool, self.jinja_env)
+
+        signatures = self.__get_signatures(generator)
+        if templates is not None:
+            generator.set_render_filter(self.__create_filter(generator, self.__get_affected_templates(templates), yang_changed, signatures))
+
+        result = run_generator(generator, job.get_name(), self.profile_top)
+
+        self.signatures = signatures
+        self.cmake_files = self.__get_cmake_files(generator)
+
+        rendered = len([entry for entry in generator.generated_files if entry.get_rendered()])
+        self.logger.info("Rendered {} of {} files".format(rendered, len(generator.generated_files)))
+
+        return result
+
+    def __get_template_names(self, file: str) -> Set[str]:
+        # a template in a nested search path is known by several names, e.g. utils/macros.jinja2 and macros.jinja2
+        names = set()
+        for search_path in self.jinja_env.loader.searchpath:
+            relative = os.path.relpath(os.path.abspath(file), os.path.abspath(search_path))
+            if not relative.startswith(".."):
+                names.add(relative.replace(os.sep, "/"))
+
+        return names
+
+    def run(self, interval: float):
+        self.generate()
+
+        watcher = FileWatcher([self.yang_dir, self.config_file, "templates"])
+        self.logger.info("Watching {}, {} and the templates for changes".format(self.yang_dir, self.config_file))
+
+        # changes of a failed run are kept for the next run, e.g. until a broken template is fixed
+        templates: Set[str] = set()
+        yang_changed = False
+        full = False
+
+        while True:
+            changed = watcher.wait(interval)
+
+            modules_changed = any(file.endswith(".yang") and not os.path.relpath(file, self.yang_dir).startswith("..") for file in changed)
+            config_changed = any(os.path.abspath(file) == os.path.abspath(self.config_file) for file in changed)
+            style_changed = any(os.path.abspath(file) == os.path.abspath(CPPGenerator.CLANG_FORMAT_FILE) for file in changed)
+            changed_templates = set()
+            for file in changed:
+                if file.endswith(".jinja2"):
+                    changed_templates |= self.__get_template_names(file)
+
+            if not (modules_changed or config_changed or style_changed or changed_templates):
+                continue
+
+            self.logger.info("Changed: {}".format(", ".join(sorted(changed))))
+
+            # libyang can't reload a module, changed modules need a new context
+            if modules_changed or config_changed:
+                self.context_pool = LibyangContextPool()
+
+            templates |= changed_templates
+            yang_changed = yang_changed or modules_changed
+            full = full or config_changed or style_changed
+
+            try:
+                result = self.generate(None if full else templates, yang_changed)
+            except Exception as e:
+                self.logger.error("Regeneration failed, keeping the previous output: {}".format(e))
+                continue
+
+            templates = set()
+            yang_changed = False
+            full = False
+
+            if result.get_failed_files():
+                self.logger.error("Failed to format {} file(s)".format(len(result.get_failed_files())))
+
+            self.logger.info("Watching for changes")
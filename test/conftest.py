@@ -0,0 +1,53 @@
+import os
+import shutil
+import subprocess
+import sys
+
+from typing import Dict, List
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, SRC_DIR)
+
+
+def require_generator():
+    """
+    Skips a test which runs the generator unless all of its dependencies are installed.
+    """
+    for module in ["libyang", "jinja2", "toml"]:
+        pytest.importorskip(module)
+    if shutil.which("clang-format") is None:
+        pytest.skip("clang-format not found")
+
+
+def run_generator(args: List[str]) -> subprocess.CompletedProcess:
+    """
+    Runs the generator from the repository root, so that the templates are found.
+    """
+    return subprocess.run([sys.executable, os.path.join(SRC_DIR, "sysrepo-plugin-generator.py")] + args, cwd=ROOT_DIR,
+                          capture_output=True, text=True, check=True)
+
+
+def generate_test_plugin(out_dir: str, *args: str) -> subprocess.CompletedProcess:
+    """
+    Generates the plugin of the test Yang modules into out_dir.
+    """
+    return run_generator(["-d", os.path.join(TEST_DIR, "yang"), "-c", os.path.join(TEST_DIR, "config", "generator-test.toml"),
+                          "-o", out_dir] + list(args))
+
+
+def read_tree(dir: str) -> Dict[str, bytes]:
+    """
+    Returns the content of all files within a directory, mapped by their paths relative to the directory.
+    """
+    files = {}
+    for parent, _, names in os.walk(dir):
+        for name in names:
+            path = os.path.join(parent, name)
+            with open(path, "rb") as file:
+                files[os.path.relpath(path, dir)] = file.read()
+    return files
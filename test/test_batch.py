@@ -0,0 +1,70 @@
+from typing import Any, Dict
+
+import pytest
+
+for module in ["libyang", "jinja2", "toml"]:
+    pytest.importorskip(module)
+
+from core.context_pool import LibyangContextPool
+from target.cpp.batch import check_jobs, plan_groups
+
+
+class FakeJob:
+    """
+    Plugin job without a configuration file, providing what grouping and checking use.
+    """
+
+    def __init__(self, name: str, modules: Dict[str, Any], out_dir: str = None, config_file: str = None):
+        self.name = name
+        self.modules = modules
+        self.out_dir = out_dir or "out/" + name
+        self.config_file = config_file or name + ".toml"
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_config_file(self) -> str:
+        return self.config_file
+
+    def get_out_dir(self) -> str:
+        return self.out_dir
+
+    def get_modules(self) -> Dict[str, Any]:
+        return self.modules
+
+
+def test_is_compatible():
+    loaded = {"ietf-interfaces": "*", "ietf-ip": ["ipv4-non-contiguous-netmasks"]}
+
+    assert LibyangContextPool.is_compatible({}, loaded)
+    assert LibyangContextPool.is_compatible(loaded, loaded)
+    assert LibyangContextPool.is_compatible(loaded, {**loaded, "ieee802-types": "*"})
+    # features are compared regardless of their order
+    assert LibyangContextPool.is_compatible({"ietf-ip": ["a", "b"]}, {"ietf-ip": ["b", "a"]})
+
+    assert not LibyangContextPool.is_compatible(loaded, {"ietf-interfaces": "*"})
+    assert not LibyangContextPool.is_compatible(loaded, {"ietf-ip": ["ipv4-non-contiguous-netmasks"], "ietf-interfaces": "*"})
+    assert not LibyangContextPool.is_compatible(loaded, {"ietf-interfaces": "*", "ietf-ip": "*"})
+
+
+def test_plan_groups():
+    interfaces = FakeJob("interfaces", {"ietf-interfaces": "*"})
+    ip = FakeJob("ip", {"ietf-interfaces": "*", "ietf-ip": "*"})
+    bridge = FakeJob("bridge", {"ietf-interfaces": "*", "ieee802-dot1q-bridge": "*"})
+    system = FakeJob("system", {"ietf-system": "*"})
+
+    groups = plan_groups([system, bridge, ip, interfaces])
+
+    # Plugins are added in the order of their number of modules to the group whose last plugin's modules they start
+    # with. ip doesn't start with the modules of bridge, which interfaces was followed by, hence, it gets a new context.
+    assert [[job.get_name() for job in group] for group in groups] == [["system"], ["interfaces", "bridge"], ["ip"]]
+
+
+def test_check_jobs():
+    check_jobs([FakeJob("a", {}), FakeJob("b", {})])
+
+    with pytest.raises(ValueError):
+        check_jobs([FakeJob("system", {}, "out/a/system", "a/system.toml"), FakeJob("system", {}, "out/b/system", "b/system.toml")])
+
+    with pytest.raises(ValueError):
+        check_jobs([FakeJob("a", {}, "out/system"), FakeJob("b", {}, "out/./system")])
@@ -0,0 +1,37 @@
+import os
+
+from core.format_cache import FormatCache
+
+
+def test_key():
+    key = FormatCache.get_key("style", "a.cpp", "int a;")
+
+    assert FormatCache.get_key("style", "b.cpp", "int a;") == key
+    assert FormatCache.get_key("other-style", "a.cpp", "int a;") != key
+    assert FormatCache.get_key("style", "a.hpp", "int a;") != key
+    assert FormatCache.get_key("style", "a.cpp", "int b;") != key
+
+
+def test_store_and_load(tmp_path):
+    cache = FormatCache(str(tmp_path), 1024)
+    key = FormatCache.get_key("style", "a.cpp", "int a;")
+    assert cache.load(key) is None
+
+    cache.store(key, "int a;\n")
+
+    assert cache.load(key) == "int a;\n"
+
+
+def test_evict(tmp_path):
+    cache = FormatCache(str(tmp_path), 10)
+    keys = [FormatCache.get_key("style", "a.cpp", str(idx)) for idx in range(3)]
+    for idx, key in enumerate(keys):
+        cache.store(key, "12345")
+        path = os.path.join(tmp_path, "format", key[:2], key)
+        os.utime(path, ns=(idx * 10 ** 9, idx * 10 ** 9))
+
+    # the least recently used entry is removed until the entries fit into the size limit
+    assert cache.evict() == 1
+    assert cache.load(keys[0]) is None
+    assert cache.load(keys[1]) == "12345"
+    assert cache.load(keys[2]) == "12345"
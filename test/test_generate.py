@@ -0,0 +1,26 @@
+from conftest import generate_test_plugin, read_tree, require_generator
+
+
+def test_parallel_render(tmp_path):
+    require_generator()
+
+    serial_dir = str(tmp_path / "serial")
+    parallel_dir = str(tmp_path / "parallel")
+    generate_test_plugin(serial_dir, "-j", "1")
+    generate_test_plugin(parallel_dir, "-j", "4", "-r")
+
+    assert read_tree(parallel_dir) == read_tree(serial_dir)
+
+
+def test_cached_schema(tmp_path):
+    require_generator()
+
+    cache_dir = str(tmp_path / "cache")
+    uncached_dir = str(tmp_path / "uncached")
+    cached_dir = str(tmp_path / "cached")
+    generate_test_plugin(uncached_dir)
+    # the first run fills the cache, the second one loads the schema from it
+    generate_test_plugin(str(tmp_path / "filling"), "--cache-dir", cache_dir)
+    generate_test_plugin(cached_dir, "--cache-dir", cache_dir)
+
+    assert read_tree(cached_dir) == read_tree(uncached_dir)
@@ -0,0 +1,82 @@
+import json
+import os
+
+from conftest import generate_test_plugin, read_tree, require_generator
+
+from core.manifest import OutputManifest
+
+
+def test_round_trip(tmp_path):
+    manifest = OutputManifest(str(tmp_path))
+    manifest.set_hash("core/api/a.cpp", OutputManifest.hash_content(b"a"))
+    manifest.set_hash("CMakeLists.txt", OutputManifest.hash_content(b"b"))
+    manifest.save()
+
+    loaded = OutputManifest(str(tmp_path))
+    loaded.load()
+
+    assert loaded.get_files() == manifest.get_files()
+    assert loaded.get_hash("core/api/a.cpp") == OutputManifest.hash_content(b"a")
+    assert loaded.get_hash("missing.cpp") is None
+
+
+def test_missing_manifest(tmp_path):
+    manifest = OutputManifest(str(tmp_path))
+    manifest.load()
+
+    assert manifest.get_files() == {}
+
+
+def test_broken_manifest(tmp_path):
+    (tmp_path / OutputManifest.FILENAME).write_text("{")
+
+    manifest = OutputManifest(str(tmp_path))
+    manifest.load()
+
+    assert manifest.get_files() == {}
+
+
+def test_other_version(tmp_path):
+    (tmp_path / OutputManifest.FILENAME).write_text(json.dumps({"version": OutputManifest.VERSION + 1, "files": {"a.cpp": "0"}}))
+
+    manifest = OutputManifest(str(tmp_path))
+    manifest.load()
+
+    assert manifest.get_files() == {}
+
+
+def test_hash_file(tmp_path):
+    path = tmp_path / "a.cpp"
+    path.write_bytes(b"a")
+
+    assert OutputManifest.hash_file(str(path)) == OutputManifest.hash_content(b"a")
+    assert OutputManifest.hash_file(str(tmp_path / "missing.cpp")) is None
+
+
+def test_stale_manifest(tmp_path):
+    require_generator()
+
+    out_dir = str(tmp_path / "out")
+    generate_test_plugin(out_dir, "-i")
+    expected = read_tree(out_dir)
+
+    # a non-incremental run rewrites the manifest, which lists the generated files afterwards
+    generate_test_plugin(out_dir)
+    with open(os.path.join(out_dir, OutputManifest.FILENAME)) as file:
+        listed = set(json.load(file)["files"])
+    assert listed == set(expected) - {OutputManifest.FILENAME}
+
+    # files edited or removed since are written again, although their hashes in the manifest didn't change
+    edited = os.path.join(out_dir, "CMakeLists.txt")
+    with open(edited, "a") as file:
+        file.write("# edited\n")
+    removed = next(os.path.join(out_dir, file) for file in expected if file.endswith(".cpp"))
+    os.remove(removed)
+
+    generate_test_plugin(out_dir, "-i")
+    assert read_tree(out_dir) == expected
+
+    # also when the removed file is outside of the selected subtree
+    os.remove(removed)
+    generate_test_plugin(out_dir, "--only", "/generator-test:top/state")
+    assert read_tree(out_dir) == expected
@@ -0,0 +1,108 @@
+from typing import Optional
+
+import pytest
+
+pytest.importorskip("libyang")
+
+from libyang.schema import Node as LyNode
+
+from core.node_filter import NodeFilter
+from core.utils import normalize_data_path
+
+
+class FakeModule:
+    def __init__(self, name: str):
+        self.module_name = name
+
+    def name(self) -> str:
+        return self.module_name
+
+
+class FakeNode:
+    def __init__(self, data_path: str, parent: Optional["FakeNode"] = None, nodetype: int = LyNode.CONTAINER, key: bool = False):
+        self.path = data_path
+        self.parent_node = parent
+        self.type_id = nodetype
+        self.key = key
+
+    def nodetype(self) -> int:
+        return self.type_id
+
+    def is_key(self) -> bool:
+        return self.key
+
+    def parent(self) -> Optional["FakeNode"]:
+        return self.parent_node
+
+    def module(self) -> FakeModule:
+        return FakeModule(self.path.split(":")[0][1:])
+
+    def data_path(self) -> str:
+        return self.path
+
+
+INTERFACES = FakeNode("/ietf-interfaces:interfaces")
+INTERFACE = FakeNode("/ietf-interfaces:interfaces/interface", INTERFACES, LyNode.LIST)
+NAME = FakeNode("/ietf-interfaces:interfaces/interface/name", INTERFACE, LyNode.LEAF, key=True)
+DESCRIPTION = FakeNode("/ietf-interfaces:interfaces/interface/description", INTERFACE, LyNode.LEAF)
+STATISTICS = FakeNode("/ietf-interfaces:interfaces/interface/statistics", INTERFACE)
+COUNTER = FakeNode("/ietf-interfaces:interfaces/interface/statistics/in-octets", STATISTICS, LyNode.LEAF)
+IPV4 = FakeNode("/ietf-interfaces:interfaces/interface/ietf-ip:ipv4", INTERFACE)
+SYSTEM = FakeNode("/ietf-system:system")
+
+NODES = [INTERFACES, INTERFACE, NAME, DESCRIPTION, STATISTICS, COUNTER, IPV4, SYSTEM]
+
+
+def get_pruned(node_filter: NodeFilter):
+    return [node for node in NODES if node_filter.is_pruned(node)]
+
+
+def test_normalize_data_path():
+    assert normalize_data_path("/ietf-interfaces:interfaces/ietf-interfaces:interface[name='%s']") == "/ietf-interfaces:interfaces/interface"
+    assert normalize_data_path("/ietf-interfaces:interfaces/interface/ietf-ip:ipv4/ietf-ip:address") == "/ietf-interfaces:interfaces/interface/ietf-ip:ipv4/address"
+
+
+def test_inactive():
+    node_filter = NodeFilter([], [], [])
+
+    assert not node_filter.is_active()
+    assert get_pruned(node_filter) == []
+
+
+def test_exclude():
+    node_filter = NodeFilter([], ["/ietf-interfaces:interfaces/interface[name='eth0']/statistics"], [])
+
+    assert get_pruned(node_filter) == [STATISTICS, COUNTER]
+    assert node_filter.get_unmatched() == []
+
+
+def test_include():
+    node_filter = NodeFilter(["/ietf-interfaces:interfaces/ietf-interfaces:interface/statistics"], [], [])
+
+    # the ancestors of the included subtree and the keys of the lists on the path to it are kept
+    assert get_pruned(node_filter) == [DESCRIPTION, IPV4, SYSTEM]
+
+
+def test_include_and_exclude():
+    node_filter = NodeFilter(["/ietf-interfaces:interfaces"], ["/ietf-interfaces:interfaces/interface/ietf-ip:ipv4"], [])
+
+    assert get_pruned(node_filter) == [IPV4, SYSTEM]
+
+
+def test_keys_are_never_pruned():
+    node_filter = NodeFilter([], ["/ietf-interfaces:interfaces/interface/name"], [])
+
+    assert get_pruned(node_filter) == []
+
+
+def test_pruned_module():
+    node_filter = NodeFilter([], [], ["ietf-system"])
+
+    assert get_pruned(node_filter) == [SYSTEM]
+
+
+def test_unmatched():
+    node_filter = NodeFilter(["/ietf-interfaces:interfaces"], ["/ietf-interfaces:unknown"], [])
+    get_pruned(node_filter)
+
+    assert node_filter.get_unmatched() == ["/ietf-interfaces:unknown"]
@@ -0,0 +1,66 @@
+import tarfile
+import zipfile
+
+import pytest
+
+from core.output import ArchiveOutput, FileSystemOutput, MemoryOutput, OutputBackend
+
+
+def test_incomplete_backend():
+    class WriteOnlyOutput(OutputBackend):
+        def write(self, path: str, text: str):
+            pass
+
+    with pytest.raises(TypeError):
+        WriteOnlyOutput()
+
+
+def test_file_system_output(tmp_path):
+    output = FileSystemOutput(str(tmp_path))
+    output.make_dir("core/api")
+    output.write("core/api/a.cpp", "a")
+
+    assert output.read("core/api/a.cpp") == "a"
+    assert (tmp_path / "core" / "api" / "a.cpp").read_text() == "a"
+
+
+def test_memory_output():
+    output = MemoryOutput()
+    output.make_dir("core")
+    output.make_dir("core")
+    output.write("core/a.cpp", "a")
+    output.write("core/a.cpp", "b")
+
+    assert output.get_dirs() == ["core"]
+    assert output.has_file("core/a.cpp")
+    assert output.read("core/a.cpp") == "b"
+
+
+@pytest.mark.parametrize("format", ["tar", "tar.gz"])
+def test_tar_archive(tmp_path, format):
+    path = tmp_path / ("plugin." + format)
+    output = ArchiveOutput(str(path), format)
+    output.make_dir("core")
+    output.write("core/a.cpp", "a")
+    output.close()
+
+    with tarfile.open(str(path)) as archive:
+        assert archive.getmember("core").isdir()
+        assert archive.extractfile("core/a.cpp").read() == b"a"
+
+
+def test_zip_archive(tmp_path):
+    path = tmp_path / "plugin.zip"
+    output = ArchiveOutput(str(path), "zip")
+    output.make_dir("core")
+    output.write("core/a.cpp", "a")
+    output.close()
+
+    with zipfile.ZipFile(str(path)) as archive:
+        assert archive.namelist() == ["core/", "core/a.cpp"]
+        assert archive.read("core/a.cpp") == b"a"
+
+
+def test_unknown_archive_format(tmp_path):
+    with pytest.raises(ValueError):
+        ArchiveOutput(str(tmp_path / "plugin.rar"), "rar")
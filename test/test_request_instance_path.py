@@ -0,0 +1,71 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from conftest import ROOT_DIR
+
+TEMPLATE = os.path.join(ROOT_DIR, "templates", "cpp", "core", "api", "base.hpp.jinja2")
+
+PROGRAM = """
+#include <algorithm>
+#include <iostream>
+#include <optional>
+#include <string>
+#include <string_view>
+
+{function}
+
+int main()
+{{
+    for ( std::string line; std::getline( std::cin, line ); )
+    {{
+        const auto path{{ GetRequestInstancePath( line ) }};
+        std::cout << ( path ? std::string{{ *path }} : "<none>" ) << std::endl;
+    }}
+}}
+"""
+
+CASES = [
+    ("/ietf-interfaces:interfaces/interface[name='eth3']/statistics", "/ietf-interfaces:interfaces/interface[name='eth3']"),
+    ("/ietf-interfaces:interfaces/interface[name='eth3']", "/ietf-interfaces:interfaces/interface[name='eth3']"),
+    ("/ietf-interfaces:interfaces/interface[name=\"eth3\"]/ietf-ip:ipv4", "/ietf-interfaces:interfaces/interface[name=\"eth3\"]"),
+    # several keys and nested lists, the path ends with the last predicate
+    ("/m:a[k1='1'][k2='2']/b[k='x]y']/c", "/m:a[k1='1'][k2='2']/b[k='x]y']"),
+    # no predicates select no entries
+    ("/ietf-interfaces:interfaces/interface/statistics", "<none>"),
+    # neither are expressions other than a key compared with a quoted value
+    ("/ietf-interfaces:interfaces/interface[name='eth3']/statistics | /ietf-system:system", "<none>"),
+    ("/ietf-interfaces:interfaces/*", "<none>"),
+    ("/m:a[1]/b", "<none>"),
+    ("/m:a[k=1]/b", "<none>"),
+    ("/m:a[k='1'", "<none>"),
+    ("/m:a[k='1']/../b", "<none>"),
+    ("//m:a[k='1']", "<none>"),
+    ("m:a[k='1']", "<none>"),
+]
+
+
+def extract_function(name: str) -> str:
+    with open(TEMPLATE) as file:
+        text = file.read()
+
+    start = text.index("inline std::optional<std::string_view> {}(".format(name))
+    end = text.index("\n}\n", start) + 3
+    return text[start:end]
+
+
+def test_get_request_instance_path(tmp_path):
+    compiler = shutil.which("g++") or shutil.which("clang++")
+    if compiler is None:
+        pytest.skip("no C++ compiler found")
+
+    source = tmp_path / "request_instance_path.cpp"
+    source.write_text(PROGRAM.format(function=extract_function("GetRequestInstancePath")))
+    binary = str(tmp_path / "request_instance_path")
+    subprocess.run([compiler, "-std=c++20", "-Wall", "-Werror", "-o", binary, str(source)], check=True)
+
+    result = subprocess.run([binary], input="".join(xpath + "\n" for xpath, _ in CASES), capture_output=True, text=True, check=True)
+
+    assert list(zip([xpath for xpath, _ in CASES], result.stdout.splitlines())) == CASES
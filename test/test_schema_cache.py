@@ -0,0 +1,88 @@
+import importlib.metadata
+
+import pytest
+
+pytest.importorskip("libyang")
+
+from core.schema import SchemaCache, SchemaModule
+
+MODULES = {"main": ["test-mod"], "other": [], "features": {}}
+
+
+@pytest.fixture
+def yang_dir(tmp_path):
+    dir = tmp_path / "yang"
+    dir.mkdir()
+    (dir / "test-mod.yang").write_text("module test-mod {}")
+    return dir
+
+
+def get_key(tmp_path, yang_dir, modules=MODULES) -> str:
+    return SchemaCache(str(tmp_path / "cache")).get_key(str(yang_dir), modules)
+
+
+def test_same_inputs(tmp_path, yang_dir):
+    assert get_key(tmp_path, yang_dir) == get_key(tmp_path, yang_dir)
+
+
+def test_other_files_are_ignored(tmp_path, yang_dir):
+    key = get_key(tmp_path, yang_dir)
+    (yang_dir / "README.md").write_text("not a module")
+
+    assert get_key(tmp_path, yang_dir) == key
+
+
+def test_changed_module(tmp_path, yang_dir):
+    key = get_key(tmp_path, yang_dir)
+    (yang_dir / "test-mod.yang").write_text("module test-mod { leaf a { type string; } }")
+
+    assert get_key(tmp_path, yang_dir) != key
+
+
+def test_added_module(tmp_path, yang_dir):
+    key = get_key(tmp_path, yang_dir)
+    (yang_dir / "other-mod.yang").write_text("module other-mod {}")
+
+    assert get_key(tmp_path, yang_dir) != key
+
+
+def test_changed_configuration(tmp_path, yang_dir):
+    key = get_key(tmp_path, yang_dir)
+
+    assert get_key(tmp_path, yang_dir, {**MODULES, "other": ["other-mod"]}) != key
+    assert get_key(tmp_path, yang_dir, {**MODULES, "features": {"test-mod": ["a"]}}) != key
+
+
+def test_changed_generator_version(tmp_path, yang_dir, monkeypatch):
+    key = get_key(tmp_path, yang_dir)
+    monkeypatch.setattr(SchemaCache, "VERSION", SchemaCache.VERSION + 1)
+
+    assert get_key(tmp_path, yang_dir) != key
+
+
+@pytest.mark.parametrize("package", SchemaCache.PACKAGES)
+def test_changed_package_version(tmp_path, yang_dir, monkeypatch, package):
+    key = get_key(tmp_path, yang_dir)
+    version = importlib.metadata.version
+    monkeypatch.setattr(importlib.metadata, "version", lambda name: "0.0.0-test" if name == package else version(name))
+
+    assert get_key(tmp_path, yang_dir) != key
+
+
+def test_store_and_load(tmp_path):
+    cache = SchemaCache(str(tmp_path / "cache"))
+    assert cache.load("key") is None
+
+    cache.store("key", [SchemaModule("test-mod", "Test module.")])
+    modules = cache.load("key")
+
+    assert [(module.name(), module.description()) for module in modules] == [("test-mod", "Test module.")]
+
+
+def test_broken_entry(tmp_path):
+    cache = SchemaCache(str(tmp_path / "cache"))
+    cache.store("key", [])
+    path = next((tmp_path / "cache").iterdir())
+    path.write_bytes(b"broken")
+
+    assert cache.load("key") is None
@@ -0,0 +1,97 @@
+from typing import Callable, List, Tuple
+
+import pytest
+
+pytest.importorskip("libyang")
+
+from core.walker import FusedWalker, Walker
+
+
+class FakeLeaf:
+    def __init__(self, name: str):
+        self.node_name = name
+
+    def name(self) -> str:
+        return self.node_name
+
+
+class FakeContainer(FakeLeaf):
+    def __init__(self, name: str, children: List[FakeLeaf]):
+        super().__init__(name)
+        self.child_nodes = children
+
+    def children(self) -> List[FakeLeaf]:
+        return self.child_nodes
+
+
+TREE = [
+    FakeContainer("a", [
+        FakeLeaf("a1"),
+        FakeContainer("a2", [FakeLeaf("a21"), FakeLeaf("x22")]),
+        FakeContainer("x3", [FakeLeaf("a31")]),
+    ]),
+    FakeLeaf("b"),
+    FakeContainer("c", [FakeContainer("c1", [FakeLeaf("c11")])]),
+]
+
+
+class RecordingWalker(Walker):
+    """
+    Records the calls of a walker, accepting the nodes matched by accept and skipping the children of the nodes
+    matched by skip.
+    """
+
+    def __init__(self, root_nodes, accept: Callable[[str], bool], skip: Callable[[str], bool]):
+        super().__init__(root_nodes)
+        self.accept = accept
+        self.skip = skip
+        self.calls: List[Tuple] = []
+
+    def add_node(self, node):
+        self.calls.append(("add", node.name()))
+        return self.accept(node.name())
+
+    def walk_node(self, node, depth):
+        self.calls.append(("walk", node.name(), depth))
+        return self.skip(node.name())
+
+    def on_finish(self):
+        self.calls.append(("finish",))
+
+
+def create_walkers() -> List[RecordingWalker]:
+    return [
+        RecordingWalker(TREE, lambda name: True, lambda name: False),
+        RecordingWalker(TREE, lambda name: not name.startswith("x"), lambda name: False),
+        RecordingWalker(TREE, lambda name: True, lambda name: name in ["a2", "c"]),
+        RecordingWalker(TREE, lambda name: name == "b", lambda name: False),
+    ]
+
+
+def test_fused_walker():
+    solo_walkers = create_walkers()
+    for walker in solo_walkers:
+        walker.walk()
+
+    fused_walkers = create_walkers()
+    FusedWalker(TREE, fused_walkers).walk()
+
+    # each walker is called for the same nodes in the same order as when walking on its own
+    for solo, fused in zip(solo_walkers, fused_walkers):
+        assert fused.calls == solo.calls
+
+
+def test_fused_walker_finishes_in_order():
+    finished = []
+
+    class FinishingWalker(Walker):
+        def __init__(self, name: str):
+            super().__init__([])
+            self.name = name
+
+        def on_finish(self):
+            finished.append(self.name)
+
+    FusedWalker(TREE, [FinishingWalker("first"), FinishingWalker("second")]).walk()
+
+    assert finished == ["first", "second"]